@@ -2,10 +2,14 @@
 # File: app.py
 
 import streamlit as st
-from src.sections import health_outcome, financial_risk_protection, access
-from streamlit_extras.stylable_container import stylable_container
+from src.sections import load_section
+from src.utils.dataset_cache import refresh_datasets
+from src.utils.metrics import span, start_run
 
 st.set_page_config(layout="wide")
+start_run()
+# Pick up new data drops; drops changed datasets and the figures built on them.
+refresh_datasets()
 
 # --- Load Custom CSS ---
 with open(".streamlit/style.css") as f:
@@ -72,13 +76,12 @@ with col1:
 
 
 # --- Main Section Render (after AI panel setup) ---
+section = load_section(st.session_state.selected_goal)
+
 with col2:
-    if st.session_state.selected_goal == "Health Outcome":
-        health_outcome.render()
-    elif st.session_state.selected_goal == "Financial Risk Protection":
-        financial_risk_protection.render()
-    elif st.session_state.selected_goal == "Access":
-        access.render()
+    if section is not None:
+        with span("render", section=section.__name__.rsplit(".", 1)[-1]):
+            section.render()
 
     # --- Control Knobs ---
     with st.container(key="control_knob_container"):
@@ -105,10 +108,8 @@ with col2:
 
 # --- AI Insights Panel ---
 with col3:
-    if st.session_state.selected_goal == "Health Outcome":
-        health_outcome.render_insight()
-    elif st.session_state.selected_goal == "Financial Risk Protection":
-        financial_risk_protection.render_insight()
+    if hasattr(section, "render_insight"):
+        section.render_insight()
     else:
         st.markdown(
             f"""
@@ -124,3 +125,9 @@ with col3:
         """,
             unsafe_allow_html=True,
         )
+
+# --- Render timings (opt-in with ?debug=1) ---
+if st.query_params.get("debug") == "1":
+    from src.sections.debug_panel import render_debug_panel
+
+    render_debug_panel()
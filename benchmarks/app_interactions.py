@@ -0,0 +1,304 @@
+# Drives app.py headlessly (streamlit.testing.v1.AppTest) through every section
+# and filter option on synthetic data, and compares per-interaction latency,
+# figure payload size and peak RSS with a checked-in baseline.
+#
+#   python -m benchmarks.app_interactions                  # 1x, compare to baseline
+#   python -m benchmarks.app_interactions --scale 10
+#   python -m benchmarks.app_interactions --exhaustive     # every filter combination
+#   python -m benchmarks.app_interactions --update         # rewrite the baseline
+#
+# Inputs are generated once per scale (benchmarks/synthetic_data.py) and
+# ingested under the system temp dir. Each run starts a fresh interpreter, so
+# the first visit to a selection is cold and revisits hit the caches, as on a
+# freshly started server. Latency is the wall time of one rerun, payload is
+# the Plotly JSON or map component arguments sent to the browser and peak RSS
+# is the child's ru_maxrss.
+# Numbers are machine-dependent: refresh the baseline on the box you compare
+# against.
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.synthetic_data import generate
+from src.utils.access_options import HEALTH_AMENITIES
+from src.utils.geo_options import STATE_NAMES
+from src.utils.hale_options import AGE_OPTIONS, GENDER_OPTIONS, RACE_OPTIONS, YEAR_OPTIONS
+from src.utils.sahie_options import AGE_MAP, INCOME_MAP, SEX_MAP
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "app_interactions.json")
+TOLERANCE = 1.25
+PAYLOAD_TOLERANCE = 1.05
+RERUN_TIMEOUT_S = 600
+MAP_LABEL = "Map"
+AMENITY_LABEL = "Select health amenities to display"
+
+
+def data_dir(scale: float) -> str:
+    return os.path.join(tempfile.gettempdir(), f"commons-care-bench-{scale:g}x")
+
+
+def prepare(scale: float) -> str:
+    # Generate and ingest once per scale; later runs reuse the directory.
+    root = data_dir(scale)
+    marker = os.path.join(root, "synthetic.json")
+    if os.path.exists(marker):
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    print(f"Generating {scale:g}x inputs in {root} ...")
+    summary = generate(root, scale)
+    subprocess.run(
+        [sys.executable, "-m", "src.cli", "ingest"],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": REPO_DIR},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    os.symlink(os.path.join(REPO_DIR, ".streamlit"), os.path.join(root, ".streamlit"))
+    with open(marker, "w") as f:
+        json.dump(summary, f, indent=2)
+    return root
+
+
+class Recorder:
+    def __init__(self, at):
+        self.at = at
+        self.rows = []
+
+    def widget(self, kind: str, label: str):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def step(self, section: str, name: str, action) -> None:
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+        if self.at.exception:
+            raise RuntimeError(f"{section}: {name}: {self.at.exception[0].value}")
+        names = {row["name"] for row in self.rows}
+        name = f"{section}: {name}"
+        if name in names:
+            name += f" #{sum(n.startswith(name) for n in names) + 1}"
+        self.rows.append(
+            {
+                "name": name,
+                "section": section,
+                "ms": elapsed * 1000,
+                "payload_bytes": payload_bytes(self.at),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+
+    def click(self, section: str, label: str) -> None:
+        self.step(section, "open", lambda: self.widget("button", label).click().run())
+
+    def set(self, section: str, *changes: tuple[str, str, object], name: str | None = None) -> None:
+        # Several widgets can change before a single rerun.
+        def action():
+            for kind, label, value in changes:
+                self.widget(kind, label).set_value(value)
+            self.at.run()
+
+        name = name or " | ".join(f"{label}={value}" for _, label, value in changes)
+        self.step(section, name, action)
+
+    def sweep(self, section: str, kind: str, label: str, values) -> None:
+        for value in values:
+            self.set(section, (kind, label, value))
+
+
+def payload_bytes(at) -> int:
+    # Plotly figure JSON, plus the arguments and binary vectors of the county
+    # map component when it renders instead.
+    plotly = sum(len(chart.proto.spec) for chart in at.get("plotly_chart"))
+    components = sum(
+        len(c.proto.json_args) + sum(len(arg.bytes) for arg in c.proto.special_args)
+        for c in at.get("component_instance")
+    )
+    return plotly + components
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_interactions(root: str, exhaustive: bool = False) -> list[dict]:
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(root)
+    sys.path.insert(0, REPO_DIR)
+    # Without earlier request counts the figure warm-up stays idle, so every
+    # run starts from the same state.
+    popularity = os.path.join("output", "figure_popularity.json")
+    if os.path.exists(popularity):
+        os.remove(popularity)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_S)
+    rec = Recorder(at)
+    rec.step("access", "open", at.run)
+
+    # Multiselects are swept one option at a time plus all options; radios and
+    # selectboxes take every value, or every combination with --exhaustive.
+    map_modes = rec.widget("radio", MAP_LABEL).options
+    amenities = list(HEALTH_AMENITIES)
+    for mode in [*map_modes[1:], map_modes[0]]:
+        rec.set("access", ("radio", MAP_LABEL, mode))
+        for selected in [[a] for a in amenities] + [amenities]:
+            rec.set(
+                "access",
+                ("multiselect", AMENITY_LABEL, selected),
+                name=f"{mode} | amenities={selected[0] if len(selected) == 1 else 'all'}",
+            )
+    # Options are shown as state names; the widget values are FIPS codes.
+    shown = set(rec.widget("selectbox", "Region").options)
+    rec.sweep("access", "selectbox", "Region", [code for code, name in STATE_NAMES.items() if name in shown])
+
+    rec.click("health_outcome", "Health Outcomes")
+    hale = [
+        ("selectbox", "Gender", GENDER_OPTIONS),
+        ("selectbox", "Select Year", YEAR_OPTIONS),
+        ("selectbox", "Select Age Group", AGE_OPTIONS),
+        ("selectbox", "Select Race/Ethnicity", RACE_OPTIONS),
+    ]
+    _sweep_all(rec, "health_outcome", hale, exhaustive)
+    rec.set("health_outcome", ("radio", "View", "Change over time"))
+    rec.sweep(
+        "health_outcome",
+        "select_slider",
+        "Select Years",
+        [(start, YEAR_OPTIONS[-1]) for start in YEAR_OPTIONS[1:-1]],
+    )
+    rec.set("health_outcome", ("radio", "View", "Single year"))
+
+    rec.click("financial_risk_protection", "Financial Risk Protections")
+    sahie = [
+        ("selectbox", "Sex", list(SEX_MAP.values())),
+        ("selectbox", "Age Group", list(AGE_MAP.values())),
+        ("selectbox", "Income Level", list(INCOME_MAP.values())),
+    ]
+    _sweep_all(rec, "financial_risk_protection", sahie, exhaustive)
+    return rec.rows
+
+
+def _sweep_all(rec: Recorder, section: str, widgets: list, exhaustive: bool) -> None:
+    if not exhaustive:
+        for kind, label, values in widgets:
+            rec.sweep(section, kind, label, values)
+        return
+    for values in itertools.product(*(options for _, _, options in widgets)):
+        rec.set(section, *[(kind, label, value) for (kind, label, _), value in zip(widgets, values)])
+
+
+def summarize(rows: list[dict]) -> dict:
+    sections = {}
+    for section in dict.fromkeys(row["section"] for row in rows):
+        ms = np.array([row["ms"] for row in rows if row["section"] == section])
+        payload = max(row["payload_bytes"] for row in rows if row["section"] == section)
+        sections[section] = {
+            "interactions": len(ms),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "max_ms": round(float(ms.max()), 1),
+            "payload_kb": round(payload / 1024, 1),
+        }
+    return {
+        "peak_rss_mb": round(max(row["peak_rss_mb"] for row in rows), 1),
+        "sections": sections,
+        "interactions": {
+            row["name"]: {"ms": round(row["ms"], 1), "payload_kb": round(row["payload_bytes"] / 1024, 1)}
+            for row in rows
+        },
+    }
+
+
+def regressions(result: dict, ref: dict) -> list[str]:
+    found = []
+    if result["peak_rss_mb"] > ref["peak_rss_mb"] * TOLERANCE:
+        found.append(f"peak RSS {result['peak_rss_mb']:.0f} MB (baseline {ref['peak_rss_mb']:.0f} MB)")
+    for section, stats in result["sections"].items():
+        base = ref["sections"].get(section)
+        if base is None:
+            continue
+        for key, tolerance in (("p50_ms", TOLERANCE), ("p95_ms", TOLERANCE), ("payload_kb", PAYLOAD_TOLERANCE)):
+            if stats[key] > base[key] * tolerance:
+                found.append(f"{section} {key} {stats[key]:.1f} (baseline {base[key]:.1f})")
+    return found
+
+
+def main(scale: float, exhaustive: bool, update: bool, verbose: bool) -> int:
+    root = prepare(scale)
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.app_interactions", "--child", root, *(["--exhaustive"] if exhaustive else [])],
+        cwd=REPO_DIR,
+        env={**os.environ, "PYTHONPATH": REPO_DIR},
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode:
+        print(out.stderr[-4000:])
+        return out.returncode
+    result = summarize(json.loads(out.stdout.splitlines()[-1]))
+
+    key = f"{scale:g}x" + ("-exhaustive" if exhaustive else "")
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r") as f:
+            baseline = json.load(f)
+    ref = baseline.get(key)
+
+    print(f"{key}: peak RSS {result['peak_rss_mb']:.0f} MB" + (f"  (baseline {ref['peak_rss_mb']:.0f} MB)" if ref else ""))
+    for section, stats in result["sections"].items():
+        base = (ref or {}).get("sections", {}).get(section)
+        line = (
+            f"  {section:<26} n={stats['interactions']:<5} p50 {stats['p50_ms']:7.1f} ms  "
+            f"p95 {stats['p95_ms']:7.1f} ms  max {stats['max_ms']:7.1f} ms  payload {stats['payload_kb']:8.1f} KB"
+        )
+        if base:
+            line += f"  (baseline p50 {base['p50_ms']:.1f}, p95 {base['p95_ms']:.1f}, {base['payload_kb']:.1f} KB)"
+        print(line)
+    if verbose:
+        ref_rows = (ref or {}).get("interactions", {})
+        for name, row in result["interactions"].items():
+            base = ref_rows.get(name)
+            delta = f"  (baseline {base['ms']:.1f} ms)" if base else ""
+            print(f"    {row['ms']:8.1f} ms  {row['payload_kb']:8.1f} KB  {name}{delta}")
+
+    if update:
+        baseline[key] = result
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+    found = regressions(result, ref) if ref else []
+    if found:
+        print(f"Worse than baseline x{TOLERANCE} (payload x{PAYLOAD_TOLERANCE}):")
+        for line in found:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark app interactions on synthetic data.")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--exhaustive", action="store_true", help="every filter combination per section")
+    parser.add_argument("--update", action="store_true", help="rewrite the baseline for this scale")
+    parser.add_argument("--verbose", action="store_true", help="print every interaction")
+    parser.add_argument("--child", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        rows = run_interactions(args.child, args.exhaustive)
+        print(json.dumps(rows))
+        sys.exit(0)
+    sys.exit(main(args.scale, args.exhaustive, args.update, args.verbose))
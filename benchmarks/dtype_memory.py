@@ -0,0 +1,45 @@
+# In-memory size of every HALE year plus the SAHIE index under the declared
+# schemas (src/utils/schemas.py) vs the object/float64 layout they replace.
+#
+#   python -m benchmarks.dtype_memory              # data under ./data
+#   python -m benchmarks.dtype_memory --synthetic  # full-size generated frames
+#
+# Sizes are pandas deep memory usage, so string columns count their Python
+# objects.
+
+import sys
+from benchmarks.synthetic_data import hale_table, sahie_table
+from src.utils.hale_cube import read_all_ages_cube
+from src.utils.hale_data import read_hale_year
+from src.utils.hale_options import YEAR_OPTIONS
+from src.utils.sahie_data import build_sahie_index, read_sahie_index
+from src.utils.schemas import legacy_dtypes, memory_mb
+
+
+def datasets(synthetic: bool):
+    if synthetic:
+        hale = hale_table()
+        for year in YEAR_OPTIONS:
+            yield f"HALE {year}", hale
+        yield "SAHIE index", build_sahie_index(sahie_table()).reset_index()
+        return
+    for year in YEAR_OPTIONS:
+        df = read_hale_year(year)
+        if df is not None:
+            yield f"HALE {year}", df
+    cube = read_all_ages_cube()
+    if cube is not None:
+        yield "HALE All Ages cube", cube.reset_index()
+    index = read_sahie_index()
+    if index is not None:
+        yield "SAHIE index", index.reset_index()
+
+
+if __name__ == "__main__":
+    before_total = after_total = 0.0
+    for name, df in datasets("--synthetic" in sys.argv):
+        before, after = memory_mb(legacy_dtypes(df)), memory_mb(df)
+        before_total += before
+        after_total += after
+        print(f"{name:>20}: {len(df):>9,} rows  {before:8.1f} MB -> {after:7.1f} MB")
+    print(f"{'total':>20}: {'':>14}{before_total:8.1f} MB -> {after_total:7.1f} MB")
@@ -0,0 +1,52 @@
+# Compare cold HALE loads: raw IHME CSV vs the year-partitioned parquet store.
+#
+#   python -m src.utils.hale_store          # build the store once
+#   python -m benchmarks.hale_load 2019
+#
+# Each load runs in a fresh interpreter so nothing is warm; peak RSS is the
+# child's ru_maxrss minus the RSS after imports.
+
+import json
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, sys, time
+import pandas as pd
+from src.utils.hale_store import HALE_COLUMNS, read_hale_csv, read_hale_store
+
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if sys.argv[1] == "csv":
+    df = read_hale_csv(sys.argv[2], HALE_COLUMNS)
+else:
+    df = read_hale_store(years=[sys.argv[2]], columns=HALE_COLUMNS)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "rows": 0 if df is None else len(df),
+    "seconds": elapsed,
+    "peak_rss_mb": (peak - base) / 1024,
+    "frame_mb": 0 if df is None else df.memory_usage(deep=True).sum() / 2**20,
+}))
+"""
+
+
+def run(source: str, year: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, source, year],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+if __name__ == "__main__":
+    year = sys.argv[1] if len(sys.argv) > 1 else "2019"
+    for source in ("csv", "store"):
+        r = run(source, year)
+        print(
+            f"{source:>5}: {r['rows']:>8} rows  {r['seconds']:.3f}s  "
+            f"peak +{r['peak_rss_mb']:.1f} MB  frame {r['frame_mb']:.1f} MB"
+        )
@@ -0,0 +1,31 @@
+# Per-interaction cost of a SAHIE (sex, age, income) slice: the old three-mask
+# + groupby path against a lookup on the pre-grouped index.
+#
+#   python -m benchmarks.sahie_slice [counties]
+
+import sys
+import timeit
+import pandas as pd
+from benchmarks.synthetic_data import COUNTIES, sahie_table
+from src.utils.sahie_data import build_sahie_index, sahie_slice
+
+
+def masked(df: pd.DataFrame, sex: int, age: int, income: int) -> pd.DataFrame:
+    filtered = df[(df["sexcat"] == sex) & (df["agecat"] == age) & (df["iprcat"] == income)]
+    return (
+        filtered.groupby("fips")
+        .agg({"PCTUI": "mean", "county_name": "first", "state_name": "first"})
+        .reset_index()
+    )
+
+
+if __name__ == "__main__":
+    counties = int(sys.argv[1]) if len(sys.argv) > 1 else COUNTIES
+    df = sahie_table(counties)
+    index = build_sahie_index(df)
+    n = 50
+    t_mask = timeit.timeit(lambda: masked(df, 1, 2, 3), number=n) / n
+    t_index = timeit.timeit(lambda: sahie_slice(index, 1, 2, 3), number=n) / n
+    print(f"rows={len(df):,}  slice={len(sahie_slice(index, 1, 2, 3)):,}")
+    print(f"mask + groupby : {t_mask * 1e3:8.2f} ms")
+    print(f"indexed slice  : {t_index * 1e3:8.2f} ms  ({t_mask / t_index:.0f}x)")
@@ -0,0 +1,71 @@
+# Resident memory per worker: every worker reading its own copy of a dataset
+# vs attaching to one memory-mapped Arrow IPC file (src/utils/shared_datasets).
+#
+#   python -m benchmarks.shared_memory_rss [workers] [million_rows]
+#
+# PSS (proportional set size) splits shared pages between the processes that
+# map them, so its sum across workers is the real host-wide cost. Linux only.
+
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from src.utils import shared_datasets
+
+
+def memory_kb() -> dict[str, int]:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                fields[name] = int(rest.split()[0])
+    return fields
+
+
+def worker(mode: str, tmp: str, barrier, results) -> None:
+    shared_datasets.SHARED_DIR = tmp
+    parquet_path = os.path.join(tmp, "bench.parquet")
+    if mode == "private":
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = shared_datasets.attach("bench")
+    # Touch every value so mapped pages are actually resident.
+    total = sum(float(df[c].sum()) for c in df.columns if df[c].dtype.kind == "f")
+    barrier.wait()
+    results.put({**memory_kb(), "checksum": total})
+    barrier.wait()
+
+
+def run(mode: str, workers: int, tmp: str) -> list[dict]:
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, tmp, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return out
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rows = int(float(sys.argv[2]) * 1e6) if len(sys.argv) > 2 else 5_000_000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({c: rng.random(rows).astype("float32") for c in ("val", "upper", "lower")})
+    df["fips"] = rng.integers(1000, 57000, rows).astype("int32")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shared_datasets.SHARED_DIR = tmp
+        parquet_path = os.path.join(tmp, "bench.parquet")
+        df.to_parquet(parquet_path)
+        shared_datasets.publish("bench", df)
+        print(f"{rows:,} rows, {df.memory_usage().sum() / 2**20:.0f} MB in memory, {workers} workers")
+        for mode in ("private", "shared"):
+            stats = run(mode, workers, tmp)
+            rss = sum(s["Rss"] for s in stats) / 1024
+            pss = sum(s["Pss"] for s in stats) / 1024
+            print(f"{mode:>8}: RSS/worker {rss / workers:7.1f} MB   PSS total {pss:7.1f} MB")
@@ -0,0 +1,97 @@
+# Import-time breakdown of what the app loads before first paint and when
+# each section is first selected, compared with a checked-in baseline.
+#
+#   python -m benchmarks.startup_importtime            # compare to baseline
+#   python -m benchmarks.startup_importtime --update   # rewrite the baseline
+#
+# Each target runs in a fresh interpreter under `python -X importtime`; the
+# reported time is the sum of cumulative times of top-level imports, so it
+# excludes interpreter start-up; the breakdown sums self time per package. Numbers are machine-dependent: refresh the
+# baseline on the box you compare against.
+
+import ast
+import json
+import os
+import subprocess
+import sys
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "startup_importtime.json")
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+TOLERANCE = 1.25
+TOP = 8
+
+
+
+def app_imports(path: str = APP_PATH) -> str:
+    # app.py's module-level imports, read from the file so the target follows it.
+    with open(path, "r") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return "import " + ", ".join(dict.fromkeys(modules))
+
+
+TARGETS = {
+    # Everything app.py imports before the goal buttons are drawn.
+    "first paint": app_imports(),
+    "section: Access": "import src.sections.access",
+    "section: Health Outcome": "import src.sections.health_outcome",
+    "section: Financial Risk Protection": "import src.sections.financial_risk_protection",
+}
+
+
+def importtime(code: str) -> tuple[float, dict[str, float]]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, packages = 0.0, {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:") :].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+        # Nested imports are indented under their parent.
+        if not name.startswith("  "):
+            total += int(cumulative) / 1000
+    return total, packages
+
+
+def main(update: bool = False) -> int:
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r") as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    for target, code in TARGETS.items():
+        total, modules = importtime(code)
+        results[target] = round(total, 1)
+        ref = baseline.get(target)
+        delta = f"  (baseline {ref:.0f} ms)" if ref else ""
+        print(f"{target}: {total:.0f} ms{delta}")
+        for module, ms in sorted(modules.items(), key=lambda kv: -kv[1])[:TOP]:
+            print(f"    {ms:8.1f} ms  {module}")
+        if ref and total > ref * TOLERANCE:
+            regressions.append(target)
+
+    if update:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif regressions:
+        print(f"Slower than baseline x{TOLERANCE}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(update="--update" in sys.argv))
@@ -0,0 +1,274 @@
+# Synthetic raw inputs shaped like the real drops: IHME HALE CSVs, the SAHIE
+# 2022 CSV, the Plotly county GeoJSON and the extracted OSM POI table.
+#
+#   python -m benchmarks.synthetic_data DIR [--scale 10] [--years 2009,2019]
+#   cd DIR && PYTHONPATH=<repo> python -m src.cli ingest
+#
+# Files are written to the same relative paths the loaders read, so DIR can
+# be used as the working directory of the app. Scale 1 is the real size:
+# 3,143 counties and 20,000 POIs. County counts are capped by the
+# five-digit FIPS space (78 states x 999 counties, about 25x); POIs scale
+# without a cap.
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.access_options import HEALTH_AMENITIES
+from src.utils.county_geometry import COUNTY_GEOJSON_PATH
+from src.utils.geo_options import STATE_NAMES
+from src.utils.hale_options import AGE_OPTIONS, GENDER_OPTIONS, RACE_OPTIONS, YEAR_OPTIONS
+from src.utils.hale_store import HALE_CSV_DIR, hale_csv_path, read_hale_csv
+from src.utils.health_access_pois import POI_CACHE_PATH, POI_MANIFEST_PATH, compact_pois
+from src.utils.sahie_data import SAHIE_CSV_PATH, read_sahie_csv
+from src.utils.sahie_options import AGE_MAP, INCOME_MAP, SEX_MAP
+
+COUNTIES = 3143
+POINTS = 20_000
+MAX_COUNTIES = 78 * 999
+# Contiguous US, where the county grid is laid out.
+BOUNDS = (-124.5, 25.0, -67.0, 49.0)
+# Vertices per polygon edge; the real county file averages roughly 80 per county.
+EDGE_VERTICES = 20
+# Amenity mix of the health-filtered extract, plus a tail of non-health tags.
+AMENITY_WEIGHTS = {
+    **dict.fromkeys(HEALTH_AMENITIES, 0.01),
+    "pharmacy": 0.22,
+    "dentist": 0.16,
+    "doctors": 0.16,
+    "clinic": 0.14,
+    "hospital": 0.06,
+    "nursing_home": 0.05,
+    "healthcare": 0.03,
+    "social_facility": 0.03,
+    "veterinary": 0.03,
+    "bench": 0.03,
+}
+
+
+def _under(root: str, path: str) -> str:
+    return os.path.join(root, os.path.normpath(path))
+
+
+def county_layout(counties: int) -> pd.DataFrame:
+    # Row-major grid over BOUNDS; states are runs of consecutive cells so each
+    # one is a contiguous strip. Real state codes are used first.
+    counties = min(counties, MAX_COUNTIES)
+    per_state = min(999, math.ceil(counties / len(STATE_NAMES)))
+    extra = [f"{s:02d}" for s in range(1, 79) if f"{s:02d}" not in STATE_NAMES]
+    codes = [*STATE_NAMES, *extra][: math.ceil(counties / per_state)]
+    i = np.arange(counties)
+    state = np.asarray(codes)[i // per_state]
+    county = i % per_state + 1
+    west, south, east, north = BOUNDS
+    cols = math.ceil(math.sqrt(counties * (east - west) / (north - south)))
+    rows = math.ceil(counties / cols)
+    size = min((east - west) / cols, (north - south) / rows)
+    return pd.DataFrame(
+        {
+            "fips": np.char.add(state.astype(str), np.char.zfill(county.astype(str), 3)),
+            "state": state,
+            "x0": west + (i % cols) * size,
+            "y0": north - (i // cols + 1) * size,
+            "size": size,
+        }
+    )
+
+
+def _edge(start: float, fixed: float, size: float, horizontal: bool) -> list[list[float]]:
+    # Wiggle that is zero at the corners and depends only on the edge's own
+    # position, so neighbouring counties produce identical shared edges.
+    t = np.linspace(0, 1, EDGE_VERTICES + 1)
+    phase = 12.9898 * start + 78.233 * fixed
+    offset = 0.08 * size * np.sin(np.pi * t) * np.sin(3 * np.pi * t + phase)
+    along = start + t * size
+    if horizontal:
+        return np.column_stack([along, fixed + offset]).round(5).tolist()
+    return np.column_stack([fixed + offset, along]).round(5).tolist()
+
+
+def county_geojson(layout: pd.DataFrame) -> dict:
+    features = []
+    for row in layout.itertuples():
+        x0, y0, s = row.x0, row.y0, row.size
+        bottom = _edge(x0, y0, s, True)
+        right = _edge(y0, x0 + s, s, False)
+        top = _edge(x0, y0 + s, s, True)[::-1]
+        left = _edge(y0, x0, s, False)[::-1]
+        ring = bottom + right[1:] + top[1:] + left[1:]
+        features.append(
+            {
+                "type": "Feature",
+                "id": row.fips,
+                "properties": {
+                    "GEO_ID": f"0500000US{row.fips}",
+                    "STATE": row.state,
+                    "COUNTY": row.fips[2:],
+                    "NAME": f"County {row.fips}",
+                    "LSAD": "County",
+                    "CENSUSAREA": round(s * s * 4700, 3),
+                },
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def hale_frame(layout: pd.DataFrame, year, rng: np.random.Generator) -> pd.DataFrame:
+    # Every (race, sex, age, county) row of one IHME year file, plus the
+    # national rows that carry no FIPS code.
+    ages = AGE_OPTIONS[:-1]
+    locations = [*layout["fips"], None]
+    n = len(RACE_OPTIONS) * len(GENDER_OPTIONS) * len(ages)
+    combos = pd.MultiIndex.from_product(
+        [RACE_OPTIONS, GENDER_OPTIONS, range(len(ages))], names=["race_name", "sex_name", "age"]
+    ).to_frame(index=False)
+    df = combos.loc[combos.index.repeat(len(locations))].reset_index(drop=True)
+    fips = pd.Series(np.tile(np.asarray(locations, dtype=object), n))
+    val = 72 - 3.6 * df["age"].to_numpy() + 0.05 * (int(year) - 2009) + rng.normal(0, 3, len(df))
+    spread = rng.uniform(0.5, 3, len(df))
+    return pd.DataFrame(
+        {
+            "measure_id": 28,
+            "measure_name": "HALE",
+            "location_id": 0,
+            "location_name": ("County " + fips).fillna("United States of America"),
+            "fips": pd.to_numeric(fips).astype("float64"),
+            "race_id": 1,
+            "race_name": df["race_name"],
+            "sex_id": 3,
+            "sex_name": df["sex_name"],
+            "age_group_id": df["age"],
+            "age_name": np.asarray(ages)[df["age"]],
+            "year": int(year),
+            "metric_id": 5,
+            "metric_name": "Years",
+            "val": val,
+            "upper": val + spread,
+            "lower": val - spread,
+        }
+    )
+
+
+def sahie_frame(layout: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    # County rows (geocat 50) for every sex/age/income category plus the
+    # state rows (geocat 40) the reader drops; about 1% of estimates are blank.
+    states = layout.drop_duplicates("state")["state"].to_numpy()
+    places = pd.DataFrame(
+        {
+            "statefips": np.concatenate([layout["state"].astype(int), states.astype(int)]),
+            "countyfips": np.concatenate([layout["fips"].str[2:].astype(int), np.zeros(len(states), int)]),
+            "geocat": np.concatenate([np.full(len(layout), 50), np.full(len(states), 40)]),
+        }
+    )
+    combos = pd.MultiIndex.from_product(
+        [list(SEX_MAP), list(AGE_MAP), list(INCOME_MAP)], names=["sexcat", "agecat", "iprcat"]
+    ).to_frame(index=False)
+    df = combos.merge(places, how="cross")
+    n = len(df)
+    pctui = rng.uniform(2, 30, n).round(1)
+    state_code = df["statefips"].map(lambda s: f"{s:02d}")
+    return pd.DataFrame(
+        {
+            "year": 2022,
+            "version": "Production",
+            "statefips": df["statefips"],
+            "countyfips": df["countyfips"],
+            "geocat": df["geocat"],
+            "agecat": df["agecat"],
+            "racecat": 0,
+            "sexcat": df["sexcat"],
+            "iprcat": df["iprcat"],
+            "NIPR": rng.integers(500, 500_000, n),
+            "nipr_moe": rng.integers(50, 5_000, n),
+            "NUI": rng.integers(50, 50_000, n),
+            "nui_moe": rng.integers(5, 500, n),
+            "PCTUI": np.where(rng.random(n) < 0.01, "", pctui.astype(str)),
+            "pctui_moe": rng.uniform(0.5, 5, n).round(1),
+            "state_name": state_code.map(STATE_NAMES).fillna("State " + state_code),
+            "county_name": np.where(df["geocat"] == 50, "County " + state_code + df["countyfips"].map("{:03d}".format), ""),
+        }
+    )
+
+
+def poi_frame(layout: pd.DataFrame, points: int, rng: np.random.Generator) -> pd.DataFrame:
+    # Points cluster around county centres, like towns; ~30% have no name,
+    # as in the OSM extract.
+    amenities = list(AMENITY_WEIGHTS)
+    weights = np.asarray(list(AMENITY_WEIGHTS.values()))
+    amenity = rng.choice(amenities, points, p=weights / weights.sum())
+    county = rng.integers(0, len(layout), points)
+    size = layout["size"].iloc[0]
+    lon = layout["x0"].to_numpy()[county] + size / 2 + rng.normal(0, size / 5, points)
+    lat = layout["y0"].to_numpy()[county] + size / 2 + rng.normal(0, size / 5, points)
+    name = pd.Series([f"{a.replace('_', ' ').title()} {i}" for i, a in enumerate(amenity)], dtype="string")
+    name[rng.random(points) < 0.3] = pd.NA
+    return compact_pois(pd.DataFrame({"amenity": amenity, "name": name, "lat": lat, "lon": lon}))
+
+
+# In-memory frames as the dashboard's readers return them, for benchmarks
+# that time a step after the CSV parse. They go through a temporary CSV, so
+# the cleaning and schema are exactly the readers'.
+def hale_table(counties: int = COUNTIES, year=YEAR_OPTIONS[0], seed: int = 0) -> pd.DataFrame:
+    frame = hale_frame(county_layout(counties), year, np.random.default_rng(seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        frame.to_csv(hale_csv_path(year, tmp), index=False, float_format="%.6f")
+        return read_hale_csv(year, csv_dir=tmp)
+
+
+def sahie_table(counties: int = COUNTIES, seed: int = 0) -> pd.DataFrame:
+    frame = sahie_frame(county_layout(counties), np.random.default_rng(seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, os.path.basename(SAHIE_CSV_PATH))
+        frame.to_csv(path, index=False)
+        return read_sahie_csv(path)
+
+
+def generate(root: str, scale: float = 1, years=YEAR_OPTIONS, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    layout = county_layout(round(COUNTIES * scale))
+    points = round(POINTS * scale)
+
+    path = _under(root, COUNTY_GEOJSON_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="latin-1") as f:
+        json.dump(county_geojson(layout), f)
+
+    os.makedirs(_under(root, HALE_CSV_DIR), exist_ok=True)
+    for year in years:
+        hale_frame(layout, year, rng).to_csv(
+            hale_csv_path(year, _under(root, HALE_CSV_DIR)), index=False, float_format="%.6f"
+        )
+
+    path = _under(root, SAHIE_CSV_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sahie_frame(layout, rng).to_csv(path, index=False)
+
+    # No .pbf: the POI table is written straight to the extraction cache, and
+    # the manifest records a source hash so derived artifacts can key on it.
+    pois = poi_frame(layout, points, rng)
+    path = _under(root, POI_CACHE_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(pois, preserve_index=False), path, compression="zstd")
+    digest = hashlib.sha256(f"synthetic:{scale}:{seed}".encode()).hexdigest()
+    with open(_under(root, POI_MANIFEST_PATH), "w") as f:
+        json.dump({"source": {"synthetic": True, "sha256": digest}, "rows": len(pois)}, f, indent=2)
+
+    return {"scale": scale, "seed": seed, "years": [str(y) for y in years], "counties": len(layout), "points": points}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic HALE, SAHIE, county and POI inputs.")
+    parser.add_argument("root")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--years", default=",".join(YEAR_OPTIONS), help="comma-separated HALE years")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    summary = generate(args.root, args.scale, args.years.split(","), args.seed)
+    print(f"{summary['counties']:,} counties, {summary['points']:,} POIs, HALE {', '.join(summary['years'])} -> {args.root}")
@@ -0,0 +1,165 @@
+# Offline maintenance commands: python -m src.cli <command> --help
+
+import argparse
+import asyncio
+import hashlib
+import os
+from dotenv import load_dotenv
+
+
+def _file_hash(path: str) -> str:
+    if not os.path.exists(path):
+        return ""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def generate_insights_command(args: argparse.Namespace) -> None:
+    from src.utils.insight_generator import BACKENDS, generate_insights
+    from src.utils.insight_stats import STATS_PATHS, stats_contexts
+    from src.utils.insight_store import InsightStore
+
+    async def run() -> None:
+        # One event loop for every dataset so the backend's HTTP client is reused.
+        backend = BACKENDS[args.backend](model=args.model, base_url=args.base_url)
+        store = InsightStore()
+        for dataset in args.datasets:
+            await generate_insights(
+                dataset,
+                backend,
+                contexts=stats_contexts(dataset),
+                concurrency=args.concurrency,
+                per_minute=args.rpm,
+                retries=args.retries,
+                limit=args.limit,
+                overwrite=args.overwrite,
+                store=store,
+                source_hash=_file_hash(STATS_PATHS[dataset]),
+            )
+
+    asyncio.run(run())
+
+
+def build_stats_command(args: argparse.Namespace) -> None:
+    from src.utils.insight_stats import write_stats
+
+    for path in write_stats():
+        print(f"Wrote {path}")
+
+
+def import_insights_command(args: argparse.Namespace) -> None:
+    from src.utils.insight_generator import INSIGHT_PATHS
+    from src.utils.insight_store import InsightStore
+
+    store = InsightStore()
+    for dataset, path in INSIGHT_PATHS.items():
+        if os.path.exists(path):
+            count = store.import_json(dataset, path, model=args.model)
+            print(f"Imported {count} {dataset} insights from {path}")
+
+
+def ingest_command(args: argparse.Namespace) -> None:
+    from src.utils.ingest import INGEST_MANIFEST_PATH, IngestError, ingest
+
+    try:
+        manifest = ingest(publish_shared=not args.no_publish)
+    except IngestError as e:
+        raise SystemExit(f"Validation failed; no artifacts written.\n{e}")
+    for path, entry in manifest["artifacts"].items():
+        rows = f"{entry['rows']:>9,} rows" if "rows" in entry else " " * 14
+        print(f"{rows}  {entry['bytes'] / 2**20:7.2f} MB  {path}")
+    for name, coverage in manifest["coverage"].items():
+        if coverage.get("missing") or coverage.get("unknown"):
+            print(
+                f"{name}: {len(coverage['missing'])} counties missing, "
+                f"{len(coverage['unknown'])} FIPS codes not in the county geometry"
+            )
+    print(f"Wrote {INGEST_MANIFEST_PATH}")
+
+
+def serve_slices_command(args: argparse.Namespace) -> None:
+    from src.utils.slice_service import serve
+
+    serve(args.host, args.port, verbose=args.verbose)
+
+
+def extract_pois_command(args: argparse.Namespace) -> None:
+    from src.utils.health_access_pois import POI_CACHE_PATH, POI_PBF_PATH, refresh_poi_cache
+    from src.utils.osm_extract import POI_EXTRACT_WORKERS, OsmExtractError
+
+    pbf_path = args.pbf or POI_PBF_PATH
+    if not os.path.exists(pbf_path):
+        raise SystemExit(f"No OSM extract at {pbf_path}")
+    try:
+        rebuilt = refresh_poi_cache(
+            pbf_path, force=args.force, workers=args.workers or POI_EXTRACT_WORKERS, verbose=True
+        )
+    except OsmExtractError as e:
+        raise SystemExit(str(e))
+    print(f"POI cache {'rebuilt' if rebuilt else 'unchanged'}: {POI_CACHE_PATH}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(prog="commons-care")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser(
+        "generate-insights", help="Generate AI insight texts; resumes interrupted runs."
+    )
+    generate.add_argument("datasets", nargs="+", choices=["hale", "sahie"])
+    generate.add_argument("--backend", default="openai", choices=["openai", "echo"])
+    generate.add_argument("--model", default="gpt-4o-mini")
+    generate.add_argument("--base-url", help="OpenAI-compatible endpoint, e.g. a local stub server.")
+    generate.add_argument("--concurrency", type=int, default=8)
+    generate.add_argument("--rpm", type=float, default=300, help="Request rate limit per minute.")
+    generate.add_argument("--retries", type=int, default=4)
+    generate.add_argument("--limit", type=int, help="Generate at most this many new keys.")
+    generate.add_argument("--overwrite", action="store_true", help="Ignore the existing output file.")
+    generate.set_defaults(func=generate_insights_command)
+
+    stats = commands.add_parser(
+        "build-stats", help="Precompute per-filter summary statistics for insights."
+    )
+    stats.set_defaults(func=build_stats_command)
+
+    importer = commands.add_parser(
+        "import-insights", help="Import the existing insight JSON files into the insight store."
+    )
+    importer.add_argument("--model", default="legacy", help="Model name recorded for imported texts.")
+    importer.set_defaults(func=import_insights_command)
+
+    ingester = commands.add_parser(
+        "ingest", help="Validate a data drop and write the artifacts the dashboard loads."
+    )
+    ingester.add_argument(
+        "--no-publish", action="store_true", help="Skip publishing shared Arrow files for workers."
+    )
+    ingester.set_defaults(func=ingest_command)
+
+    slices = commands.add_parser(
+        "serve-slices", help="Serve HALE and SAHIE slices to replicas (COMMONS_CARE_DATA_BACKEND=http)."
+    )
+    slices.add_argument("--host", default="127.0.0.1")
+    slices.add_argument("--port", type=int, default=8765)
+    slices.add_argument("--verbose", action="store_true", help="Log every request.")
+    slices.set_defaults(func=serve_slices_command)
+
+    pois = commands.add_parser(
+        "extract-pois", help="Split an OSM pbf by state and extract its health amenities, one state per worker process."
+    )
+    pois.add_argument(
+        "--pbf",
+        help="Pre-filtered or full (e.g. national) extract, or a directory of per-state extracts; "
+        "default COMMONS_CARE_POI_PBF.",
+    )
+    pois.add_argument("--workers", type=int, help="Worker processes; default COMMONS_CARE_POI_WORKERS.")
+    pois.add_argument("--force", action="store_true", help="Rebuild even if the extract is unchanged.")
+    pois.set_defaults(func=extract_pois_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
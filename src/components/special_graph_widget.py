@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import streamlit.components.v1 as components
+from src.utils.county_geometry import geojson_sources, load_county_geojson, polygon_rings
+from src.utils.dataset_cache import cached_dataset
+from src.utils.geo_options import STATE_NAMES
+from src.utils.metrics import annotate
+
+# County choropleth that keeps geometry in the browser. Counties are projected
+# and quantized once into a content-addressed bundle the iframe fetches a
+# single time; each rerun then sends only float32 value vectors in the
+# bundle's county order, instead of a full Plotly figure with its GeoJSON.
+# Set COMMONS_CARE_MAP_RENDERER=plotly to go back to st.plotly_chart.
+MAP_RENDERER = os.environ.get("COMMONS_CARE_MAP_RENDERER", "component")
+MAP_COMPONENT_DIR = "./data/artifacts/map_component"
+MAP_DETAIL = "medium"
+FRONTEND_INDEX = os.path.join(os.path.dirname(__file__), "frontend", "index.html")
+MAP_HEIGHT = 560
+
+# Albers USA as in d3.geoAlbersUsa: (rotation, center, parallels, scale,
+# offset) for the lower 48, Alaska and Hawaii insets.
+_LOWER_48 = (96, (-0.6, 38.7), (29.5, 45.5), 1.0, (0.0, 0.0))
+_INSETS = {
+    "02": (154, (-2.0, 58.5), (55.0, 65.0), 0.35, (-0.307, 0.201)),
+    "15": (157, (-3.0, 19.9), (8.0, 18.0), 1.0, (-0.205, 0.212)),
+}
+
+
+def _conic_equal_area(lon, lat, rotation, parallels):
+    phi0, phi1 = np.radians(parallels)
+    n = (np.sin(phi0) + np.sin(phi1)) / 2
+    c = 1 + np.sin(phi0) * (2 * n - np.sin(phi0))
+    r0 = np.sqrt(c) / n
+    lam = np.radians((np.asarray(lon) + rotation + 180) % 360 - 180)
+    r = np.sqrt(c - 2 * n * np.sin(np.radians(lat))) / n
+    return r * np.sin(lam * n), r0 - r * np.cos(lam * n)
+
+
+def albers_usa(lon: np.ndarray, lat: np.ndarray, state: str) -> tuple[np.ndarray, np.ndarray]:
+    # Screen orientation (y grows downwards), in units of the d3 scale.
+    rotation, center, parallels, scale, (dx, dy) = _INSETS.get(state, _LOWER_48)
+    x, y = _conic_equal_area(lon, lat, rotation, parallels)
+    cx, cy = _conic_equal_area(center[0] - rotation, center[1], rotation, parallels)
+    return (x - cx) * scale + dx, -(y - cy) * scale + dy
+
+
+def geometry_bundle(geojson: dict) -> bytes:
+    fips, names, ring_start, point_start, xs, ys = [], [], [0], [0], [], []
+    for feature in geojson["features"]:
+        state = feature["id"][:2]
+        for polygon in polygon_rings(feature["geometry"]):
+            for ring in polygon:
+                ring = np.asarray(ring, dtype=np.float64)
+                x, y = albers_usa(ring[:, 0], ring[:, 1], state)
+                xs.append(x)
+                ys.append(y)
+                point_start.append(point_start[-1] + len(ring))
+        ring_start.append(len(point_start) - 1)
+        fips.append(feature["id"])
+        names.append(feature["properties"].get("NAME"))
+
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    x0, y0 = x.min(), y.min()
+    step = max(x.max() - x0, y.max() - y0) / 65535
+    header = json.dumps(
+        {
+            "counties": len(fips),
+            "rings": len(point_start) - 1,
+            "points": len(x),
+            "width": round((x.max() - x0) / step),
+            "height": round((y.max() - y0) / step),
+            "fips": fips,
+            "names": names,
+            "state_names": STATE_NAMES,
+        },
+        separators=(",", ":"),
+    ).encode()
+    padding = b" " * (-(4 + len(header)) % 4)
+    xy = np.column_stack([(x - x0) / step, (y - y0) / step]).round().astype("<u2")
+    return b"".join(
+        [
+            np.uint32(len(header) + len(padding)).astype("<u4").tobytes(),
+            header + padding,
+            np.asarray(ring_start, dtype="<u4").tobytes(),
+            np.asarray(point_start, dtype="<u4").tobytes(),
+            xy.tobytes(),
+        ]
+    )
+
+
+@cached_dataset("map_component", lambda: geojson_sources(MAP_DETAIL))
+def load_map_component():
+    # Returns (component, bundle file name, county order) or None when no
+    # county geometry is vendored. Follows the geometry, so a new ingest
+    # ships a new bundle.
+    geojson = load_county_geojson(MAP_DETAIL)
+    if isinstance(geojson, str):
+        return None
+    bundle = geometry_bundle(geojson)
+    name = f"counties-{hashlib.sha256(bundle).hexdigest()[:16]}.bin"
+    os.makedirs(MAP_COMPONENT_DIR, exist_ok=True)
+    path = os.path.join(MAP_COMPONENT_DIR, name)
+    if not os.path.exists(path):
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(bundle)
+        os.replace(f"{path}.tmp", path)
+    shutil.copyfile(FRONTEND_INDEX, os.path.join(MAP_COMPONENT_DIR, "index.html"))
+    component = components.declare_component("county_map", path=os.path.abspath(MAP_COMPONENT_DIR))
+    order = pd.Index([int(f["id"]) for f in geojson["features"]], name="fips")
+    return component, name, order
+
+
+def map_available() -> bool:
+    # Without vendored geometry the sections fall back to Plotly, which can
+    # still fetch the GeoJSON by URL.
+    return MAP_RENDERER == "component" and load_map_component() is not None
+
+
+def county_vectors(df: pd.DataFrame, columns: list[str], order: pd.Index) -> bytes:
+    # Columns back to back, each in the bundle's county order; NaN where a
+    # county has no row.
+    values = df.set_index("fips")[columns].reindex(order).to_numpy(np.float32)
+    return np.ascontiguousarray(values.T).astype("<f4").tobytes()
+
+
+def county_map(
+    df: pd.DataFrame,
+    color: str,
+    *,
+    title: list[str],
+    colorscale: list,
+    range_color: tuple[float, float],
+    color_label: str,
+    value_format: str = ".2f",
+    tick_format: str = ".1f",
+    hover: dict[str, tuple[str, str]] | None = None,
+    missing_color: str = "white",
+    key: str | None = None,
+) -> None:
+    # hover: label -> (column, d3-style format such as ".2f" or "+.3f", or
+    # "yes/no" for a boolean column).
+    component, bundle, order = load_map_component()
+    hover = hover or {}
+    values = county_vectors(df, [color], order)
+    hover_values = county_vectors(df, [column for column, _ in hover.values()], order) if hover else b""
+    annotate(bytes=len(values) + len(hover_values))
+    component(
+        geometry=bundle,
+        values=values,
+        hover=hover_values or None,
+        hover_columns=[{"label": label, "format": fmt} for label, (_, fmt) in hover.items()],
+        title=title,
+        colorscale=colorscale,
+        range=[float(range_color[0]), float(range_color[1])],
+        color_label=color_label,
+        hover_format=value_format,
+        tick_format=tick_format,
+        missing_color=missing_color,
+        height=MAP_HEIGHT,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,16 @@
+import importlib
+from types import ModuleType
+
+# Goal name -> section module. Sections are imported on first selection so
+# plotly, pandas and the geo stack are not loaded before the first paint.
+SECTIONS = {
+    "Health Outcome": "src.sections.health_outcome",
+    "Financial Risk Protection": "src.sections.financial_risk_protection",
+    "Access": "src.sections.access",
+}
+
+
+def load_section(goal: str) -> ModuleType | None:
+    if goal not in SECTIONS:
+        return None
+    return importlib.import_module(SECTIONS[goal])
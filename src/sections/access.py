@@ -1,6 +1,28 @@
 import streamlit as st
 import plotly.express as px
+from src.utils.access_options import HEALTH_AMENITIES
+from src.utils.county_geometry import (
+    load_county_centroids,
+    load_county_geojson,
+    load_state_bounds,
+)
+from src.utils.county_density import density_summary
+from src.utils.data_backend import load_data_backend
+from src.utils.facility_distance import (
+    DEFAULT_RADIUS_KM,
+    distance_summary,
+    load_facility_distance,
+)
+from src.utils.geo_options import STATE_NAMES
 from src.utils.health_access_pois import load_hospital_pois
+from src.utils.metrics import span
+from src.utils.poi_index import (
+    US_VIEW,
+    load_poi_grid_index,
+    points_in_view,
+    view_for_bounds,
+)
+from src.utils.schemas import with_fips_labels
 
 
 def render():
@@ -14,45 +36,88 @@ def render():
         )
 
         pois = load_hospital_pois()
+        if pois is None:
+            st.error(
+                "Health amenity POI data not found. Build it from an OSM extract with "
+                "`python -m src.cli extract-pois` (or `python -m src.cli ingest`)."
+            )
+            return
 
-        HEALTH_AMENITIES = {
-            "hospital": "Hospital",
-            "clinic": "Clinic",
-            "doctors": "Doctor",
-            "dentist": "Dentist",
-            "pharmacy": "Pharmacy",
-            "nursing_home": "Nursing Home",
-            "rehabilitation": "Rehabilitation",
-            "birthing_center": "Birthing Center",
-            "alternative": "Alternative Medicine",
-            "physiotherapist": "Physiotherapy",
-            "psychotherapist": "Psychotherapy",
-            "healthcare": "Healthcare (Unspecified)",
-            "first_aid": "First Aid",
-            "blood_donation": "Blood Donation",
-        }
-
-        selected_amenities = st.multiselect(
-            "Select health amenities to display",
-            options=list(HEALTH_AMENITIES.keys()),
-            format_func=lambda x: HEALTH_AMENITIES[x],
-            default=["hospital", "clinic"],
+        map_mode = st.radio(
+            "Map",
+            ["Facilities", "Distance to nearest facility", "Facilities per capita"],
+            horizontal=True,
+            label_visibility="collapsed",
         )
 
-        filtered_pois = pois[pois["amenity"].isin(selected_amenities)]
-        filtered_pois["label"] = filtered_pois["amenity"].map(HEALTH_AMENITIES)
-
-        fig = px.scatter_mapbox(
-            filtered_pois,
-            lat="lat",
-            lon="lon",
-            color="amenity",
-            hover_name="name",
-            hover_data={"amenity": True, "lat": False, "lon": False},
-            zoom=3,
-            height=750,
-            color_discrete_sequence=px.colors.qualitative.Safe,
+        fc1, fc2 = st.columns([3, 1])
+
+        with fc1:
+            selected_amenities = st.multiselect(
+                "Select health amenities to display",
+                options=list(HEALTH_AMENITIES.keys()),
+                format_func=lambda x: HEALTH_AMENITIES[x],
+                default=["hospital", "clinic"],
+            )
+
+        if map_mode == "Distance to nearest facility":
+            render_distance_map(selected_amenities)
+            return
+        if map_mode == "Facilities per capita":
+            render_density_map(selected_amenities)
+            return
+
+        state_bounds = load_state_bounds()
+        with fc2:
+            region = st.selectbox(
+                "Region",
+                ["United States", *[s for s in STATE_NAMES if s in state_bounds]],
+                format_func=lambda x: STATE_NAMES.get(x, x),
+            )
+
+        render_facility_map(pois, selected_amenities, state_bounds.get(region))
+
+
+def render_facility_map(pois, selected_amenities, bounds):
+    view = view_for_bounds(bounds) if bounds else US_VIEW
+    with span("data", cache=""):
+        filtered_pois, clustered = points_in_view(
+            pois, load_poi_grid_index(), selected_amenities, bounds
         )
+    filtered_pois = filtered_pois.assign(
+        label=filtered_pois["amenity"].map(HEALTH_AMENITIES)
+    )
+
+    with span("build"):
+        if clustered:
+            # National / dense views: one bubble per grid cell and amenity.
+            fig = px.scatter_mapbox(
+                filtered_pois,
+                lat="lat",
+                lon="lon",
+                color="amenity",
+                size="count",
+                size_max=28,
+                hover_name="label",
+                hover_data={"count": True, "amenity": False, "lat": False, "lon": False},
+                center=view["center"],
+                zoom=view["zoom"],
+                height=750,
+                color_discrete_sequence=px.colors.qualitative.Safe,
+            )
+        else:
+            fig = px.scatter_mapbox(
+                filtered_pois,
+                lat="lat",
+                lon="lon",
+                color="amenity",
+                hover_name="name",
+                hover_data={"amenity": True, "lat": False, "lon": False},
+                center=view["center"],
+                zoom=view["zoom"],
+                height=750,
+                color_discrete_sequence=px.colors.qualitative.Safe,
+            )
 
         fig.update_layout(
             mapbox_style="carto-positron",
@@ -70,4 +135,131 @@ def render():
             font=dict(family="Arial", size=13),
         )
 
+    if clustered:
+        st.caption(
+            "Showing clustered counts. Select a smaller region to see individual facilities."
+        )
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def render_distance_map(selected_amenities):
+    radius_km = DEFAULT_RADIUS_KM
+    with span("data", cache=""):
+        distance = load_facility_distance(radius_km)
+    if distance is None:
+        st.error("County centroids or POI data not found. Build them with `python -m src.cli ingest`.")
+        return
+    if not selected_amenities:
+        st.warning("Select at least one amenity type.")
+        return
+
+    summary = distance_summary(distance, selected_amenities).merge(
+        load_county_centroids()[["fips", "county_name"]], on="fips", how="left"
+    )
+    summary["state_name"] = summary["fips"].str[:2].map(STATE_NAMES)
+
+    with span("build"):
+        fig = px.choropleth(
+            summary,
+            geojson=load_county_geojson(),
+            locations="fips",
+            color="nearest_km",
+            color_continuous_scale="Magma_r",
+            range_color=(0, summary["nearest_km"].quantile(0.98)),
+            scope="usa",
+            labels={
+                "nearest_km": "Nearest (km)",
+                "count_within": f"Within {radius_km:g} km",
+            },
+            hover_data={
+                "county_name": True,
+                "state_name": True,
+                "nearest_km": ":.1f",
+                "count_within": True,
+                "fips": False,
+            },
+        )
+        fig.update_layout(
+            title={
+                "text": "<b>Distance to Nearest Facility</b><br>"
+                + ", ".join(HEALTH_AMENITIES[a] for a in selected_amenities),
+                "x": 0.5,
+                "xanchor": "center",
+            },
+            font=dict(family="Arial", size=14),
+            geo=dict(
+                lakecolor="white",
+                showland=True,
+                landcolor="white",
+                showcountries=False,
+                showlakes=True,
+            ),
+            margin=dict(l=0, r=0, t=100, b=0),
+            coloraxis_colorbar=dict(title="km", tickformat=".0f"),
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+        )
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def render_density_map(selected_amenities):
+    with span("data", cache=""):
+        backend = load_data_backend()
+        counts = backend.county_counts()
+        population = backend.sahie_slice(0, 0, 0)
+    if counts is None or population is None:
+        st.error("County geometry, POI or SAHIE population data not found.")
+        return
+    if not selected_amenities:
+        st.warning("Select at least one amenity type.")
+        return
+
+    population = with_fips_labels(
+        population[["fips", "NIPR", "county_name", "state_name"]].rename(
+            columns={"NIPR": "population"}
+        )
+    )
+    summary = density_summary(counts, selected_amenities, population)
+
+    with span("build"):
+        fig = px.choropleth(
+            summary,
+            geojson=load_county_geojson(),
+            locations="fips",
+            color="per_100k",
+            color_continuous_scale="Viridis",
+            range_color=(0, summary["per_100k"].quantile(0.98)),
+            scope="usa",
+            labels={"per_100k": "Per 100k", "count": "Facilities"},
+            hover_data={
+                "county_name": True,
+                "state_name": True,
+                "count": True,
+                "per_100k": ":.1f",
+                "fips": False,
+            },
+        )
+        fig.update_layout(
+            title={
+                "text": "<b>Facilities per 100k Residents Under 65</b><br>"
+                + ", ".join(HEALTH_AMENITIES[a] for a in selected_amenities),
+                "x": 0.5,
+                "xanchor": "center",
+            },
+            font=dict(family="Arial", size=14),
+            geo=dict(
+                lakecolor="white",
+                showland=True,
+                landcolor="white",
+                showcountries=False,
+                showlakes=True,
+            ),
+            margin=dict(l=0, r=0, t=100, b=0),
+            coloraxis_colorbar=dict(title="Per 100k", tickformat=".0f"),
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+        )
+    with span("plotly_chart"):
         st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,50 @@
+import pandas as pd
+import streamlit as st
+from src.utils.dataset_cache import dataset_stats, reload_datasets
+from src.utils.figure_cache import load_figure_cache
+from src.utils.metrics import METRICS_DIR, run_spans, totals
+from src.utils.prefetch import load_prefetcher
+
+# Shown below the main layout when the page is opened with ?debug=1.
+
+
+def render_debug_panel():
+    with st.expander("Render timings", expanded=True):
+        spans = run_spans()
+        if spans:
+            # Spans are recorded as they finish; sort back into call order.
+            rows = (
+                pd.DataFrame(spans, columns=["start", "depth", "name", "section", "cache", "ms", "bytes"])
+                .sort_values("start")
+                .fillna({"cache": "", "bytes": 0})
+                .astype({"bytes": "int64"})
+            )
+            rows["stage"] = ["· " * depth + name for depth, name in zip(rows["depth"], rows["name"])]
+            st.markdown("**This run**")
+            st.dataframe(
+                rows[["stage", "section", "cache", "ms", "bytes"]].round({"ms": 1}),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        process = pd.DataFrame(totals())
+        if not process.empty:
+            st.markdown("**Since process start**")
+            st.dataframe(
+                process.round({"total_ms": 1, "mean_ms": 1, "max_ms": 1}),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        st.markdown("**Dataset cache**")
+        st.json(dataset_stats(), expanded=False)
+        if st.button("Reload datasets", key="debug_reload_datasets"):
+            reload_datasets()
+            st.rerun()
+        st.markdown("**Figure cache**")
+        st.json(load_figure_cache().stats(), expanded=False)
+        st.markdown("**Prefetch**")
+        st.json(load_prefetcher().stats(), expanded=False)
+        st.caption(
+            f"Exporting to {METRICS_DIR}" if METRICS_DIR else "Set COMMONS_CARE_METRICS_DIR to export spans."
+        )
@@ -1,7 +1,29 @@
+import pandas as pd
 import streamlit as st
 import plotly.express as px
-from src.utils.sahie_data import load_sahie_data, load_sahie_insights
-from src.utils.sahie_options import SEX_MAP, AGE_MAP, INCOME_MAP
+import plotly.graph_objects as go
+from plotly.colors import get_colorscale
+from src.components.special_graph_widget import county_map, map_available
+from src.utils.county_geometry import load_county_geojson
+from src.utils.county_ranks import rank_hover, rank_hover_data
+from src.utils.data_backend import load_data_backend
+from src.utils.dataset_cache import on_reload
+from src.utils.figure_cache import load_figure_cache, plotly_chart_spec
+from src.utils.insight_stats import load_insight_stats, stats_line
+from src.utils.insight_store import insights_available, load_insight
+from src.utils.metrics import span
+from src.utils.prefetch import load_prefetcher
+from src.utils.schemas import with_fips_labels
+from src.utils.sahie_options import (
+    SEX_MAP,
+    AGE_MAP,
+    INCOME_MAP,
+    SEX_CODES,
+    AGE_CODES,
+    INCOME_CODES,
+)
+
+SECTION = "financial_risk_protection"
 
 
 def render():
@@ -14,11 +36,6 @@ def render():
             unsafe_allow_html=True,
         )
 
-        df = load_sahie_data()
-        if df is None:
-            st.error("SAHIE 2022 data not found.")
-            return
-
         fc1, fc2, fc3 = st.columns(3)
 
         with fc1:
@@ -35,81 +52,141 @@ def render():
             )
             st.session_state["selected_income"] = selected_income
 
-        sex_code = [k for k, v in SEX_MAP.items() if v == selected_sex][0]
-        age_code = [k for k, v in AGE_MAP.items() if v == selected_age][0]
-        income_code = [k for k, v in INCOME_MAP.items() if v == selected_income][0]
-
-        filtered_df = df[
-            (df["sexcat"] == sex_code)
-            & (df["agecat"] == age_code)
-            & (df["iprcat"] == income_code)
-        ]
-
-        if filtered_df.empty:
-            st.warning("No data available for selected filters.")
+        filters = (selected_sex, selected_age, selected_income)
+        if map_available():
+            render_map(*filters)
             return
+        figures = load_figure_cache()
+        spec = figures.spec(SECTION, filters)
+        if spec is None:
+            with span("data", cache=""):
+                summary = sahie_selection(*filters)
+            if summary is None:
+                st.error("SAHIE 2022 data not found.")
+                return
+
+            if summary.empty:
+                st.warning("No data available for selected filters.")
+                return
+
+            with span("build"):
+                spec = figures.put(SECTION, filters, build_figure(summary, *filters))
+
+        with span("plotly_chart"):
+            plotly_chart_spec(spec)
+        load_prefetcher().schedule(prefetch_jobs())
+
+
+def sahie_selection(selected_sex, selected_age, selected_income) -> pd.DataFrame | None:
+    return load_data_backend().sahie_slice(
+        SEX_CODES[selected_sex], AGE_CODES[selected_age], INCOME_CODES[selected_income]
+    )
 
-        summary = (
-            filtered_df.groupby("fips")
-            .agg(
-                {
-                    "PCTUI": "mean",
-                    "county_name": "first",
-                    "state_name": "first",
-                }
-            )
-            .reset_index()
-        )
-
-        title_filters = f"{selected_sex} | {selected_age} | {selected_income}"
 
-        fig = px.choropleth(
+def render_map(selected_sex, selected_age, selected_income):
+    with span("data", cache=""):
+        summary = sahie_selection(selected_sex, selected_age, selected_income)
+    if summary is None:
+        st.error("SAHIE 2022 data not found.")
+        return
+    if summary.empty:
+        st.warning("No data available for selected filters.")
+        return
+    with span("county_map"):
+        county_map(
             summary,
-            geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-            locations="fips",
-            color="PCTUI",
-            color_continuous_scale="Reds",
-            scope="usa",
-            labels={"PCTUI": "% Uninsured"},
-            hover_data=["state_name", "county_name", "PCTUI"],
+            "PCTUI",
+            title=[
+                "Uninsured % by County",
+                f"{selected_sex} | {selected_age} | {selected_income} – SAHIE 2022",
+            ],
+            colorscale=get_colorscale("Reds"),
+            range_color=(summary["PCTUI"].min(), summary["PCTUI"].max()),
+            color_label="% Uninsured",
+            value_format=".1f",
+            hover=rank_hover(summary),
+            missing_color="lightgray",
+            key="sahie_map",
         )
-        fig.update_layout(
-            title={
-                "text": f"<b>Uninsured % by County</b><br>{title_filters} – SAHIE 2022",
-                "x": 0.5,
-                "xanchor": "center",
-            },
-            geo=dict(
-                lakecolor="white",
-                landcolor="lightgray",
-                showlakes=True,
-                showcoastlines=False,
+
+
+def build_figure(summary, selected_sex, selected_age, selected_income) -> go.Figure:
+    title_filters = f"{selected_sex} | {selected_age} | {selected_income}"
+    rank_data, rank_labels = rank_hover_data(summary)
+
+    fig = px.choropleth(
+        with_fips_labels(summary),
+        geojson=load_county_geojson(),
+        locations="fips",
+        color="PCTUI",
+        color_continuous_scale="Reds",
+        scope="usa",
+        labels={"PCTUI": "% Uninsured", **rank_labels},
+        hover_data={"state_name": True, "county_name": True, "PCTUI": True, **rank_data},
+    )
+    fig.update_layout(
+        title={
+            "text": f"<b>Uninsured % by County</b><br>{title_filters} – SAHIE 2022",
+            "x": 0.5,
+            "xanchor": "center",
+        },
+        geo=dict(
+            lakecolor="white",
+            landcolor="lightgray",
+            showlakes=True,
+            showcoastlines=False,
+        ),
+        margin=dict(l=0, r=0, t=100, b=0),
+        plot_bgcolor="white",  # White background inside the plotting area
+        paper_bgcolor="white",  # White background outside the plotting area
+    )
+    return fig
+
+
+def figure_for(selected_sex, selected_age, selected_income) -> go.Figure | None:
+    summary = sahie_selection(selected_sex, selected_age, selected_income)
+    if summary is None or summary.empty:
+        return None
+    return build_figure(summary, selected_sex, selected_age, selected_income)
+
+
+def prefetch_jobs() -> list[tuple[str, tuple]]:
+    # The HALE tab as last shown.
+    return [
+        (
+            "health_outcome",
+            (
+                st.session_state.get("race_option", "Total"),
+                st.session_state.get("age_option", "<1 year"),
+                st.session_state.get("gender_option", "Both"),
+                st.session_state.get("year_option", "2009"),
             ),
-            margin=dict(l=0, r=0, t=100, b=0),
-            plot_bgcolor="white",  # White background inside the plotting area
-            paper_bgcolor="white",  # White background outside the plotting area
         )
+    ]
 
-        st.plotly_chart(fig, use_container_width=True)
 
+# The map component renders from data slices; figure builders (and their
+# warm-up) are only needed when the Plotly path is in use.
+if not map_available():
+    load_figure_cache().register(SECTION, figure_for)
+on_reload("sahie_slice", lambda: load_figure_cache().invalidate(SECTION))
+on_reload("sahie_ranks", lambda: load_figure_cache().invalidate(SECTION))
 
-def render_insight():
-    insights = load_sahie_insights()
 
+def render_insight():
     selected_sex = st.session_state.get("selected_sex", "Both")
     selected_age = st.session_state.get("selected_age", "Under 65")
     selected_income = st.session_state.get("selected_income", "All incomes")
 
     key = f"{selected_sex} | {selected_age} | {selected_income}"
 
-    display_text = ""
-
-    if insights is None:
-        display_text = "SAHIE insights not found."
-    elif key in insights:
-        display_text = insights[key]
-    else:
-        display_text = "No insight available for the selected filters."
+    display_text = load_insight("sahie", key)
+    if display_text is None:
+        if insights_available("sahie"):
+            display_text = "No insight available for the selected filters."
+        else:
+            display_text = "SAHIE insights not found."
+    stats_text = stats_line(load_insight_stats("sahie"), key, "%")
 
     st.markdown(
         f"""
@@ -126,6 +203,7 @@ def render_insight():
         <div class="key-panel-content">
             {display_text}
         </div>
+        {stats_text}
         <div class="panel-message">
             This panel provides data-driven summaries generated by AI.
         </div>
@@ -1,7 +1,19 @@
+import pandas as pd
 import streamlit as st
 import plotly.express as px
-from src.utils.hale_data import load_hale_data
-from src.utils.hale_insights import load_hale_insights
+import plotly.graph_objects as go
+from plotly.colors import get_colorscale
+from src.components.special_graph_widget import county_map, map_available
+from src.utils.county_geometry import load_county_geojson
+from src.utils.county_ranks import rank_hover, rank_hover_data
+from src.utils.data_backend import load_data_backend
+from src.utils.dataset_cache import on_reload
+from src.utils.figure_cache import load_figure_cache, plotly_chart_spec
+from src.utils.insight_stats import load_insight_stats, stats_line
+from src.utils.insight_store import insights_available, load_insight
+from src.utils.metrics import span
+from src.utils.prefetch import load_prefetcher, neighbours
+from src.utils.schemas import with_fips_labels
 from src.utils.hale_options import (
     GENDER_OPTIONS,
     YEAR_OPTIONS,
@@ -9,6 +21,10 @@ from src.utils.hale_options import (
     RACE_OPTIONS,
 )
 
+SECTION = "health_outcome"
+TREND_SECTION = "health_outcome_trend"
+VIEW_OPTIONS = ["Single year", "Change over time"]
+
 
 def render():
     with st.container(key="hale_container"):
@@ -19,6 +35,7 @@ def render():
             """,
             unsafe_allow_html=True,
         )
+        view = st.radio("View", VIEW_OPTIONS, horizontal=True, key="hale_view")
         fc1, fc2, fc3, fc4 = st.columns(4)
 
         with fc1:
@@ -26,7 +43,12 @@ def render():
             st.session_state["gender_option"] = gender_option
 
         with fc2:
-            year_option = st.selectbox("Select Year", YEAR_OPTIONS, index=0)
+            if view == "Single year":
+                year_option = st.selectbox("Select Year", YEAR_OPTIONS, index=0)
+            else:
+                start_year, year_option = st.select_slider(
+                    "Select Years", YEAR_OPTIONS, value=(YEAR_OPTIONS[0], YEAR_OPTIONS[-1])
+                )
             st.session_state["year_option"] = year_option
 
         with fc3:
@@ -37,79 +59,275 @@ def render():
             race_option = st.selectbox("Select Race/Ethnicity", RACE_OPTIONS, index=0)
             st.session_state["race_option"] = race_option
 
-        df = load_hale_data(year_option)
-        if df is not None:
-            if age_option == "All Ages":
-                filtered_df = (
-                    df[
-                        (df["race_name"] == race_option)
-                        & (df["sex_name"] == gender_option)
-                    ]
-                    .groupby("fips")
-                    .agg(
-                        {
-                            "val": "mean",
-                            "upper": "mean",
-                            "lower": "mean",
-                            "location_name": "first",
-                        }
-                    )
-                    .reset_index()
-                )
-            else:
-                filtered_df = df[
-                    (df["race_name"] == race_option)
-                    & (df["sex_name"] == gender_option)
-                    & (df["age_name"] == age_option)
-                ]
-
-            if not filtered_df.empty:
-                fig = px.choropleth(
-                    filtered_df,
-                    geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-                    locations="fips",
-                    color="val",
-                    color_continuous_scale="Cividis",
-                    range_color=(filtered_df["val"].min(), filtered_df["val"].max()),
-                    scope="usa",
-                    labels={"val": "HALE (Years)"},
-                    hover_data={
-                        "location_name": True,
-                        "val": ":.2f",
-                        "upper": ":.2f",
-                        "lower": ":.2f",
-                        "fips": False,
-                    },
-                )
-                fig.update_layout(
-                    title={
-                        "text": f"Healthy Life Expectancy (HALE)<br>{race_option} | {age_option} | {gender_option} | {year_option}",
-                        "x": 0.5,
-                        "xanchor": "center",
-                    },
-                    font=dict(family="Arial", size=14),
-                    geo=dict(
-                        lakecolor="white",
-                        showland=True,
-                        landcolor="white",
-                        showcountries=False,
-                        showlakes=True,
-                    ),
-                    margin=dict(l=0, r=0, t=100, b=0),
-                    coloraxis_colorbar=dict(title="Years", tickformat=".1f"),
-                    plot_bgcolor="white",  # White background inside the plotting area
-                    paper_bgcolor="white",  # White background outside the plotting area
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
+        if view != "Single year":
+            render_trend(race_option, age_option, gender_option, start_year, year_option)
+            return
+
+        filters = (race_option, age_option, gender_option, year_option)
+        if map_available():
+            render_map(*filters)
+            return
+        figures = load_figure_cache()
+        spec = figures.spec(SECTION, filters)
+        if spec is None:
+            with span("data", cache=""):
+                filtered_df = hale_selection(*filters)
+            if filtered_df is None:
+                missing_data(age_option)
+                return
+            if filtered_df.empty:
                 st.warning("No data available for the selected filters.")
-        else:
-            st.error("HALE dataset not found.")
+                return
+            with span("build"):
+                spec = figures.put(SECTION, filters, build_figure(filtered_df, *filters))
+        with span("plotly_chart"):
+            plotly_chart_spec(spec)
+        load_prefetcher().schedule(prefetch_jobs(*filters))
 
 
-def render_insight():
-    insights = load_hale_insights()
+def missing_data(age_option) -> None:
+    if age_option == "All Ages":
+        # The All Ages cube is only built offline.
+        st.error("HALE All Ages table not found. Build it with `python -m src.cli ingest`.")
+    else:
+        st.error("HALE dataset not found.")
+
+
+def hale_selection(race_option, age_option, gender_option, year_option) -> pd.DataFrame | None:
+    return load_data_backend().hale_slice(year_option, race_option, age_option, gender_option)
+
+
+def render_map(race_option, age_option, gender_option, year_option):
+    with span("data", cache=""):
+        filtered_df = hale_selection(race_option, age_option, gender_option, year_option)
+    if filtered_df is None:
+        missing_data(age_option)
+        return
+    if filtered_df.empty:
+        st.warning("No data available for the selected filters.")
+        return
+    with span("county_map"):
+        county_map(
+            filtered_df,
+            "val",
+            title=[
+                "Healthy Life Expectancy (HALE)",
+                f"{race_option} | {age_option} | {gender_option} | {year_option}",
+            ],
+            colorscale=get_colorscale("Cividis"),
+            range_color=(filtered_df["val"].min(), filtered_df["val"].max()),
+            color_label="HALE (Years)",
+            hover={"Upper": ("upper", ".2f"), "Lower": ("lower", ".2f"), **rank_hover(filtered_df)},
+            key="hale_map",
+        )
+
+
+def build_figure(filtered_df, race_option, age_option, gender_option, year_option) -> go.Figure:
+    rank_data, rank_labels = rank_hover_data(filtered_df)
+    fig = px.choropleth(
+        with_fips_labels(filtered_df),
+        geojson=load_county_geojson(),
+        locations="fips",
+        color="val",
+        color_continuous_scale="Cividis",
+        range_color=(filtered_df["val"].min(), filtered_df["val"].max()),
+        scope="usa",
+        labels={"val": "HALE (Years)", **rank_labels},
+        hover_data={
+            "location_name": True,
+            "val": ":.2f",
+            "upper": ":.2f",
+            "lower": ":.2f",
+            **rank_data,
+            "fips": False,
+        },
+    )
+    fig.update_layout(
+        title={
+            "text": f"Healthy Life Expectancy (HALE)<br>{race_option} | {age_option} | {gender_option} | {year_option}",
+            "x": 0.5,
+            "xanchor": "center",
+        },
+        font=dict(family="Arial", size=14),
+        geo=dict(
+            lakecolor="white",
+            showland=True,
+            landcolor="white",
+            showcountries=False,
+            showlakes=True,
+        ),
+        margin=dict(l=0, r=0, t=100, b=0),
+        coloraxis_colorbar=dict(title="Years", tickformat=".1f"),
+        plot_bgcolor="white",  # White background inside the plotting area
+        paper_bgcolor="white",  # White background outside the plotting area
+    )
+    return fig
+
+
+def figure_for(race_option, age_option, gender_option, year_option) -> go.Figure | None:
+    filtered_df = hale_selection(race_option, age_option, gender_option, year_option)
+    if filtered_df is None or filtered_df.empty:
+        return None
+    return build_figure(filtered_df, race_option, age_option, gender_option, year_option)
+
+
+def render_trend(race_option, age_option, gender_option, start_year, end_year):
+    filters = (race_option, age_option, gender_option, start_year, end_year)
+    if map_available():
+        render_trend_map(*filters)
+        return
+    figures = load_figure_cache()
+    spec = figures.spec(TREND_SECTION, filters)
+    if spec is None:
+        with span("data", cache=""):
+            trends = load_data_backend().hale_trend(
+                start_year, end_year, race_option, age_option, gender_option
+            )
+        if trends is None:
+            missing_data(age_option)
+            return
+        if trends.empty:
+            st.warning("No data available for the selected filters.")
+            return
+        with span("build"):
+            spec = figures.put(TREND_SECTION, filters, build_trend_figure(trends, *filters))
+    with span("plotly_chart"):
+        plotly_chart_spec(spec)
 
+
+def render_trend_map(race_option, age_option, gender_option, start_year, end_year):
+    with span("data", cache=""):
+        trends = load_data_backend().hale_trend(
+            start_year, end_year, race_option, age_option, gender_option
+        )
+    if trends is None:
+        missing_data(age_option)
+        return
+    if trends.empty:
+        st.warning("No data available for the selected filters.")
+        return
+    limit = trend_limit(trends)
+    with span("county_map"):
+        county_map(
+            trends,
+            "delta",
+            title=[
+                f"Change in HALE, {start_year} to {end_year}",
+                f"{race_option} | {age_option} | {gender_option}",
+            ],
+            colorscale=get_colorscale("RdBu"),
+            range_color=(-limit, limit),
+            color_label="Change (Years)",
+            value_format="+.2f",
+            tick_format="+.1f",
+            hover={
+                f"HALE {start_year}": ("start_val", ".2f"),
+                f"HALE {end_year}": ("end_val", ".2f"),
+                "Trend (Years/yr)": ("slope", "+.3f"),
+            },
+            key="hale_trend_map",
+        )
+
+
+def trend_limit(trends: pd.DataFrame) -> float:
+    # Diverging scale centred on no change, clipped to the bulk of counties.
+    return max(float(trends["delta"].abs().quantile(0.98)), 0.1)
+
+
+def build_trend_figure(
+    trends, race_option, age_option, gender_option, start_year, end_year
+) -> go.Figure:
+    limit = trend_limit(trends)
+    fig = px.choropleth(
+        with_fips_labels(trends),
+        geojson=load_county_geojson(),
+        locations="fips",
+        color="delta",
+        color_continuous_scale="RdBu",
+        range_color=(-limit, limit),
+        color_continuous_midpoint=0,
+        scope="usa",
+        labels={
+            "delta": "Change (Years)",
+            "start_val": f"HALE {start_year}",
+            "end_val": f"HALE {end_year}",
+            "slope": "Trend (Years/yr)",
+        },
+        hover_data={
+            "location_name": True,
+            "start_val": ":.2f",
+            "end_val": ":.2f",
+            "delta": ":+.2f",
+            "slope": ":+.3f",
+            "fips": False,
+        },
+    )
+    fig.update_layout(
+        title={
+            "text": f"Change in HALE, {start_year} to {end_year}<br>{race_option} | {age_option} | {gender_option}",
+            "x": 0.5,
+            "xanchor": "center",
+        },
+        font=dict(family="Arial", size=14),
+        geo=dict(
+            lakecolor="white",
+            showland=True,
+            landcolor="white",
+            showcountries=False,
+            showlakes=True,
+        ),
+        margin=dict(l=0, r=0, t=100, b=0),
+        coloraxis_colorbar=dict(title="Years", tickformat="+.1f"),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+    )
+    return fig
+
+
+def trend_figure_for(race_option, age_option, gender_option, start_year, end_year) -> go.Figure | None:
+    trends = load_data_backend().hale_trend(
+        start_year, end_year, race_option, age_option, gender_option
+    )
+    if trends is None or trends.empty:
+        return None
+    return build_trend_figure(trends, race_option, age_option, gender_option, start_year, end_year)
+
+
+def prefetch_jobs(race_option, age_option, gender_option, year_option) -> list[tuple[str, tuple]]:
+    # Adjacent year and age group, then the Financial Risk tab as last shown.
+    jobs = [
+        (SECTION, (race_option, age_option, gender_option, year))
+        for year in neighbours(YEAR_OPTIONS, year_option)
+    ]
+    jobs += [
+        (SECTION, (race_option, age, gender_option, year_option))
+        for age in neighbours(AGE_OPTIONS, age_option)
+    ]
+    jobs.append(
+        (
+            "financial_risk_protection",
+            (
+                st.session_state.get("selected_sex", "Both"),
+                st.session_state.get("selected_age", "Under 65"),
+                st.session_state.get("selected_income", "All incomes"),
+            ),
+        )
+    )
+    return jobs
+
+
+# The map component renders from data slices; figure builders (and their
+# warm-up) are only needed when the Plotly path is in use.
+if not map_available():
+    load_figure_cache().register(SECTION, figure_for)
+    load_figure_cache().register(TREND_SECTION, trend_figure_for)
+on_reload("hale_data", lambda: load_figure_cache().invalidate(SECTION))
+on_reload("hale_all_ages", lambda: load_figure_cache().invalidate(SECTION))
+on_reload("hale_ranks", lambda: load_figure_cache().invalidate(SECTION))
+on_reload("hale_trend", lambda: load_figure_cache().invalidate(TREND_SECTION))
+
+
+def render_insight():
     gender_option = st.session_state.get("gender_option", "Both")
     year_option = st.session_state.get("year_option", "2009")
     age_option = st.session_state.get("age_option", "<1 year")
@@ -117,14 +335,13 @@ def render_insight():
 
     key = f"{race_option} | {age_option} | {gender_option} | {year_option}"
 
-    display_text = ""
-
-    if insights is None:
-        display_text = "Insights file not found or failed to load."
-    elif key in insights:
-        display_text = insights[key]
-    else:
-        display_text = "Insights not found for given data."
+    display_text = load_insight("hale", key)
+    if display_text is None:
+        if insights_available("hale"):
+            display_text = "Insights not found for given data."
+        else:
+            display_text = "Insights file not found or failed to load."
+    stats_text = stats_line(load_insight_stats("hale"), key, " yrs")
 
     st.markdown(
         f"""
@@ -142,6 +359,7 @@ def render_insight():
         <div class="key-panel-content">
             {display_text}
         </div>
+        {stats_text}
         <div class="panel-message">
             This panel provides data-driven summaries generated by AI.
         </div>
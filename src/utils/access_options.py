@@ -0,0 +1,16 @@
+HEALTH_AMENITIES = {
+    "hospital": "Hospital",
+    "clinic": "Clinic",
+    "doctors": "Doctor",
+    "dentist": "Dentist",
+    "pharmacy": "Pharmacy",
+    "nursing_home": "Nursing Home",
+    "rehabilitation": "Rehabilitation",
+    "birthing_center": "Birthing Center",
+    "alternative": "Alternative Medicine",
+    "physiotherapist": "Physiotherapy",
+    "psychotherapist": "Psychotherapy",
+    "healthcare": "Healthcare (Unspecified)",
+    "first_aid": "First Aid",
+    "blood_donation": "Blood Donation",
+}
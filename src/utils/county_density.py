@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.access_options import HEALTH_AMENITIES
+from src.utils.county_geometry import load_county_geojson
+from src.utils.dataset_cache import cached_dataset
+from src.utils.health_access_pois import POI_CACHE_PATH, load_hospital_pois
+from src.utils.metrics import traced
+
+COUNTY_COUNTS_PATH = "./data/artifacts/county_amenity_counts.parquet"
+COUNTY_COUNTS_MANIFEST_PATH = "./data/artifacts/county_amenity_counts.manifest.json"
+JOIN_DETAIL = "high"
+
+
+# shapely is imported inside the join helpers: it is only needed when the
+# counts are (re)built, not for reading the persisted table.
+def county_polygons(geojson: dict) -> tuple[np.ndarray, np.ndarray]:
+    from shapely.geometry import shape
+
+    fips = np.array([feature["id"] for feature in geojson["features"]])
+    polygons = np.array([shape(feature["geometry"]) for feature in geojson["features"]])
+    return fips, polygons
+
+
+def amenity_fingerprint(points: pd.DataFrame) -> str:
+    coords = points[["lat", "lon"]].to_numpy(np.float32)
+    coords = coords[np.lexsort((coords[:, 1], coords[:, 0]))]
+    return hashlib.sha1(coords.tobytes()).hexdigest()
+
+
+def join_counts(points: pd.DataFrame, fips: np.ndarray, tree) -> pd.Series:
+    # Bulk STRtree query; a point on a shared border is assigned to the first hit.
+    import shapely
+
+    geoms = shapely.points(points["lon"].to_numpy(), points["lat"].to_numpy())
+    point_idx, county_idx = tree.query(geoms, predicate="intersects")
+    _, first = np.unique(point_idx, return_index=True)
+    counts = np.bincount(county_idx[first], minlength=len(fips))
+    return pd.Series(counts, index=fips)
+
+
+def _read_manifest() -> dict:
+    if os.path.exists(COUNTY_COUNTS_MANIFEST_PATH):
+        with open(COUNTY_COUNTS_MANIFEST_PATH, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def empty_counts() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "fips": pd.Series(dtype=object),
+            "amenity": pd.Series(dtype=object),
+            "count": pd.Series(dtype=np.int32),
+        }
+    )
+
+
+def update_county_counts(pois: pd.DataFrame, geojson: dict) -> pd.DataFrame:
+    manifest = _read_manifest()
+    existing = (
+        pd.read_parquet(COUNTY_COUNTS_PATH)
+        if manifest and os.path.exists(COUNTY_COUNTS_PATH)
+        else None
+    )
+    fingerprints = {
+        amenity: amenity_fingerprint(group)
+        for amenity, group in pois.groupby("amenity", observed=True)
+        if amenity in HEALTH_AMENITIES
+    }
+    stale = [a for a, fp in fingerprints.items() if manifest.get(a) != fp]
+    if existing is not None and not stale and set(manifest) == set(fingerprints):
+        return existing
+
+    # Only amenity types whose points changed are re-joined.
+    frames = []
+    if existing is not None:
+        frames.append(existing[existing["amenity"].isin([a for a in fingerprints if a not in stale])])
+    if stale:
+        from shapely.strtree import STRtree
+
+        fips, polygons = county_polygons(geojson)
+        tree = STRtree(polygons)
+    for amenity in stale:
+        counts = join_counts(pois[pois["amenity"] == amenity], fips, tree)
+        frames.append(
+            pd.DataFrame(
+                {"fips": counts.index, "amenity": amenity, "count": counts.to_numpy(np.int32)}
+            )
+        )
+    # No health POIs and no earlier table (a fresh install) is an empty table.
+    result = pd.concat(frames, ignore_index=True) if frames else empty_counts()
+    result["amenity"] = result["amenity"].astype(str).astype("category")
+
+    os.makedirs(os.path.dirname(COUNTY_COUNTS_PATH), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(result, preserve_index=False), COUNTY_COUNTS_PATH)
+    with open(COUNTY_COUNTS_MANIFEST_PATH, "w") as f:
+        json.dump(fingerprints, f, indent=2)
+    return result
+
+
+@cached_dataset("county_counts", lambda: [POI_CACHE_PATH])
+@traced("load_county_counts")
+def load_county_counts() -> pd.DataFrame | None:
+    pois = load_hospital_pois()
+    geojson = load_county_geojson(JOIN_DETAIL)
+    if pois is None or isinstance(geojson, str):
+        return None
+    return update_county_counts(pois, geojson)
+
+
+def density_summary(
+    counts: pd.DataFrame, amenities: list[str], population: pd.DataFrame
+) -> pd.DataFrame:
+    summary = (
+        counts[counts["amenity"].isin(amenities)]
+        .groupby("fips", sort=False)["count"]
+        .sum()
+        .reset_index()
+        .merge(population, on="fips", how="left")
+    )
+    summary["per_100k"] = (summary["count"] / summary["population"] * 1e5).astype("float32")
+    return summary
@@ -0,0 +1,258 @@
+import json
+import os
+import sys
+import urllib.request
+import numpy as np
+import pandas as pd
+from src.utils.dataset_cache import cached_dataset
+from src.utils.metrics import traced
+
+COUNTY_GEOJSON_URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+COUNTY_GEOJSON_PATH = "./data/geojson-counties-fips.json"
+COUNTY_GEOMETRY_DIR = "./data/artifacts/geometry"
+# Derived from the "low" level by the ingest.
+STATE_BOUNDS_PATH = os.path.join(COUNTY_GEOMETRY_DIR, "state-bounds.json")
+COUNTY_CENTROIDS_PATH = os.path.join(COUNTY_GEOMETRY_DIR, "county-centroids.parquet")
+
+# detail -> (Douglas-Peucker tolerance in degrees, coordinate decimals)
+DETAIL_LEVELS = {
+    "full": (None, None),
+    "high": (0.001, 4),
+    "medium": (0.005, 3),
+    "low": (0.02, 3),
+}
+DEFAULT_DETAIL = "medium"
+
+# Only the properties the app reads are kept in simplified output.
+KEEP_PROPERTIES = ("STATE", "NAME")
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        segment = points[start + 1 : end]
+        ab = b - a
+        norm = np.hypot(ab[0], ab[1])
+        if norm == 0:
+            dist = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            dist = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def polygon_rings(geometry: dict) -> list[list]:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def _quantize(ring: list, decimals: int) -> list[tuple]:
+    out = []
+    for x, y in ring:
+        point = (round(x, decimals), round(y, decimals))
+        if not out or out[-1] != point:
+            out.append(point)
+    if out[0] == out[-1]:
+        out.pop()
+    return out
+
+
+def simplify_counties(geojson: dict, tolerance: float, decimals: int) -> dict:
+    # Shared borders are simplified once as arcs between junction points and
+    # reused by both neighbours, so adjacent counties never gap or overlap.
+    rings = []
+    for feature in geojson["features"]:
+        for polygon in polygon_rings(feature["geometry"]):
+            for ring in polygon:
+                rings.append(_quantize(ring, decimals))
+
+    owners: dict[tuple, set] = {}
+    for ring_id, ring in enumerate(rings):
+        for point in ring:
+            owners.setdefault(point, set()).add(ring_id)
+
+    arcs: dict[tuple, list] = {}
+
+    def simplified_arc(arc: list[tuple]) -> list[tuple]:
+        key = min(tuple(arc), tuple(reversed(arc)))
+        if key not in arcs:
+            arcs[key] = [tuple(p) for p in _douglas_peucker(np.array(key), tolerance).tolist()]
+        return arcs[key] if key == tuple(arc) else arcs[key][::-1]
+
+    simplified_rings = []
+    for ring in rings:
+        n = len(ring)
+        if n < 3:
+            simplified_rings.append(ring + ring[:1])
+            continue
+        junctions = [
+            i
+            for i in range(n)
+            if owners[ring[i]] != owners[ring[i - 1]] or owners[ring[i]] != owners[ring[(i + 1) % n]]
+        ] or [0]
+        out = []
+        for j, start in enumerate(junctions):
+            end = junctions[(j + 1) % len(junctions)]
+            arc = ring[start : end + 1] if end > start else ring[start:] + ring[: end + 1]
+            out.extend(simplified_arc(arc)[:-1])
+        out.append(out[0])
+        # A ring that collapsed is kept at quantized resolution instead of dropped.
+        simplified_rings.append(out if len(out) >= 4 else ring + ring[:1])
+
+    features = []
+    ring_iter = iter(simplified_rings)
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = [
+            [[list(p) for p in next(ring_iter)] for _ in polygon] for polygon in polygon_rings(geometry)
+        ]
+        features.append(
+            {
+                "type": "Feature",
+                "id": feature["id"],
+                "properties": {k: feature["properties"].get(k) for k in KEEP_PROPERTIES},
+                "geometry": {
+                    "type": geometry["type"],
+                    "coordinates": polygons[0] if geometry["type"] == "Polygon" else polygons,
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def geometry_artifact_path(detail: str) -> str:
+    return os.path.join(COUNTY_GEOMETRY_DIR, f"counties-{detail}.json")
+
+
+def read_county_geojson(detail: str = DEFAULT_DETAIL) -> dict | None:
+    tolerance, decimals = DETAIL_LEVELS[detail]
+    artifact = geometry_artifact_path(detail)
+    if tolerance is not None and os.path.exists(artifact):
+        with open(artifact, "r") as f:
+            return json.load(f)
+    if not os.path.exists(COUNTY_GEOJSON_PATH):
+        return None
+    with open(COUNTY_GEOJSON_PATH, "r", encoding="latin-1") as f:
+        geojson = json.load(f)
+    if tolerance is None:
+        return geojson
+    return simplify_counties(geojson, tolerance, decimals)
+
+
+def geojson_sources(detail: str = DEFAULT_DETAIL) -> list[str]:
+    if DETAIL_LEVELS[detail][0] is None:
+        return [COUNTY_GEOJSON_PATH]
+    return [geometry_artifact_path(detail), COUNTY_GEOJSON_PATH]
+
+
+@cached_dataset("county_geojson", geojson_sources, max_entries=len(DETAIL_LEVELS))
+@traced("load_county_geojson")
+def load_county_geojson(detail: str = DEFAULT_DETAIL) -> dict | str:
+    # Simplified levels are written by the ingest; until then the full
+    # outlines are drawn rather than simplified inside a request.
+    for path in geojson_sources(detail):
+        if os.path.exists(path):
+            with open(path, "r", encoding="latin-1") as f:
+                return json.load(f)
+    # Not vendored yet (python -m src.utils.county_geometry fetch).
+    return COUNTY_GEOJSON_URL
+
+
+def state_bounds(geojson: dict) -> dict[str, tuple[float, float, float, float]]:
+    # state fips -> (min_lon, min_lat, max_lon, max_lat)
+    bounds = {}
+    for feature in geojson["features"]:
+        xs, ys = [], []
+        for polygon in polygon_rings(feature["geometry"]):
+            for x, y in polygon[0]:
+                # Aleutian counties cross the antimeridian; fold them back west.
+                xs.append(x - 360 if x > 0 else x)
+                ys.append(y)
+        state = feature["id"][:2]
+        box = bounds.get(state, (180.0, 90.0, -180.0, -90.0))
+        bounds[state] = (min(box[0], *xs), min(box[1], *ys), max(box[2], *xs), max(box[3], *ys))
+    return bounds
+
+
+@cached_dataset("state_bounds", lambda: [STATE_BOUNDS_PATH])
+@traced("load_state_bounds")
+def load_state_bounds() -> dict[str, tuple[float, float, float, float]]:
+    # Empty until the ingest has written the geometry artifacts.
+    if not os.path.exists(STATE_BOUNDS_PATH):
+        return {}
+    with open(STATE_BOUNDS_PATH, "r") as f:
+        return {state: tuple(box) for state, box in json.load(f).items()}
+
+
+def county_centroids(geojson: dict) -> pd.DataFrame:
+    # Area-weighted centroid over each county's outer rings.
+    rows = []
+    for feature in geojson["features"]:
+        weight = cx = cy = 0.0
+        for polygon in polygon_rings(feature["geometry"]):
+            ring = np.asarray(polygon[0], dtype=np.float64)
+            x = np.where(ring[:, 0] > 0, ring[:, 0] - 360, ring[:, 0])
+            y = ring[:, 1]
+            cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+            area = cross.sum() / 2
+            if area == 0:
+                continue
+            cx += abs(area) * ((x[:-1] + x[1:]) * cross).sum() / (6 * area)
+            cy += abs(area) * ((y[:-1] + y[1:]) * cross).sum() / (6 * area)
+            weight += abs(area)
+        if weight == 0:
+            ring = np.asarray(polygon_rings(feature["geometry"])[0][0], dtype=np.float64)
+            cx, cy, weight = ring[:, 0].mean(), ring[:, 1].mean(), 1.0
+        rows.append((feature["id"], feature["properties"].get("NAME"), cy / weight, cx / weight))
+    return pd.DataFrame(rows, columns=["fips", "county_name", "lat", "lon"])
+
+
+@cached_dataset("county_centroids", lambda: [COUNTY_CENTROIDS_PATH])
+@traced("load_county_centroids")
+def load_county_centroids() -> pd.DataFrame | None:
+    # None until the ingest has written the geometry artifacts.
+    if not os.path.exists(COUNTY_CENTROIDS_PATH):
+        return None
+    return pd.read_parquet(COUNTY_CENTROIDS_PATH)
+
+
+def write_geometry_artifacts(levels=("high", "medium", "low")) -> list[str]:
+    written = []
+    os.makedirs(COUNTY_GEOMETRY_DIR, exist_ok=True)
+    for detail in levels:
+        geojson = read_county_geojson(detail)
+        if geojson is None:
+            break
+        path = geometry_artifact_path(detail)
+        with open(path, "w") as f:
+            json.dump(geojson, f, separators=(",", ":"))
+        written.append(path)
+        if detail == "low":
+            with open(STATE_BOUNDS_PATH, "w") as f:
+                json.dump(state_bounds(geojson), f)
+            county_centroids(geojson).to_parquet(COUNTY_CENTROIDS_PATH, index=False)
+            written += [STATE_BOUNDS_PATH, COUNTY_CENTROIDS_PATH]
+    return written
+
+
+if __name__ == "__main__":
+    # python -m src.utils.county_geometry fetch   (on a connected machine)
+    # python -m src.utils.county_geometry         (write simplified levels, state bounds, centroids)
+    if sys.argv[1:] == ["fetch"]:
+        urllib.request.urlretrieve(COUNTY_GEOJSON_URL, COUNTY_GEOJSON_PATH)
+        print(f"Saved {COUNTY_GEOJSON_PATH}")
+    else:
+        for path in write_geometry_artifacts():
+            print(f"{path}: {os.path.getsize(path) / 2**20:.2f} MB")
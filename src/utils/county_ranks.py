@@ -0,0 +1,185 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.dataset_cache import cached_dataset
+from src.utils.metrics import span, traced
+from src.utils.schemas import apply_schema, state_code
+
+# County ranks and percentiles for every filter combination, computed once per
+# data drop (python -m src.cli ingest) so the render path only joins a
+# slice's rows by FIPS. Rank 1 is the highest value (HALE years, % uninsured);
+# a percentile is the share of counties with a lower or equal value. HALE
+# rows also flag counties whose [lower, upper] interval contains the national
+# median, i.e. counties not distinguishable from the typical county.
+# HALE ranks are split by year like the HALE store, so a slice read only
+# opens one small file.
+HALE_RANKS_DIR = "./data/artifacts/hale_ranks"
+SAHIE_RANKS_PATH = "./data/artifacts/sahie_ranks.parquet"
+HALE_RANK_KEYS = ["year", "race_name", "sex_name", "age_name"]
+SAHIE_RANK_KEYS = ["sexcat", "agecat", "iprcat"]
+RANK_COLUMNS = ["national_rank", "state_rank", "national_pct", "state_pct"]
+CI_FLAG = "ci_overlaps_median"
+RANK_SCHEMA = {
+    "fips": "int32",
+    "national_rank": "uint16",
+    "state_rank": "uint16",
+    "national_pct": "uint8",
+    "state_pct": "uint8",
+    CI_FLAG: "bool",
+}
+# Sorted on the keys, so a slice read prunes to one or two row groups.
+RANK_ROW_GROUP = 32_768
+
+
+def hale_ranks_path(year, ranks_dir: str = HALE_RANKS_DIR) -> str:
+    return os.path.join(ranks_dir, f"year={int(year)}", "part-0.parquet")
+
+
+def ci_overlaps_median(df: pd.DataFrame, keys: list[str], value: str = "val") -> pd.Series:
+    median = df.groupby(keys, observed=True)[value].transform("median")
+    return (df["lower"] <= median) & (median <= df["upper"])
+
+
+def sort_key(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # Group code in the high 32 bits and the float32 value's bits, flipped to
+    # sort like the numbers, in the low ones: one argsort on uint64 instead of
+    # a lexsort, which is several times slower on the 12M HALE rows.
+    bits = values.astype(np.float32).view(np.uint32)
+    bits = np.where(bits & 0x80000000, ~bits, bits | 0x80000000)
+    return (groups.astype(np.uint64) << 32) | bits.astype(np.uint64)
+
+
+def group_ranks(groups: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Descending "min" rank and "max" percentile of every value within its
+    # group, like groupby().rank(), which takes seconds per call here.
+    key = sort_key(groups, values)
+    order = np.argsort(key)
+    key, g = key[order], groups[order]
+    n = len(key)
+    group_start = np.r_[True, g[1:] != g[:-1]]
+    starts = np.flatnonzero(group_start)
+    sizes = np.diff(np.r_[starts, n])
+    # Ties share the position after their last member.
+    run_starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    run_ends = np.r_[run_starts[1:], n]
+    at_or_below = np.repeat(run_ends, run_ends - run_starts) - np.repeat(starts, sizes)
+    size = np.repeat(sizes, sizes)
+    rank, pct = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.float64)
+    rank[order] = size - at_or_below + 1
+    pct[order] = at_or_below / size
+    return rank, pct
+
+
+def build_ranks(df: pd.DataFrame, keys: list[str], value: str) -> pd.DataFrame:
+    # Every filter combination at once: rows are tagged with a group code
+    # (sorted like the keys) and ranked within it, nationally and by state.
+    df = df.dropna(subset=[value])
+    groups = df.groupby(keys, observed=True).ngroup().to_numpy()
+    states = groups * 100 + state_code(df["fips"])
+    values = df[value].to_numpy()
+    national_rank, national_pct = group_ranks(groups, values)
+    state_rank, state_pct = group_ranks(states, values)
+    ranks = df[[*keys, "fips"]].assign(
+        national_rank=national_rank,
+        state_rank=state_rank,
+        national_pct=np.round(national_pct * 100),
+        state_pct=np.round(state_pct * 100),
+    )
+    if "lower" in df.columns and "upper" in df.columns:
+        ranks[CI_FLAG] = ci_overlaps_median(df, keys, value)
+    order = np.lexsort((df["fips"].to_numpy(), groups))
+    return apply_schema(ranks.iloc[order].reset_index(drop=True), RANK_SCHEMA)
+
+
+def write_ranks(ranks: pd.DataFrame, path: str) -> str:
+    # Labels as plain strings: pyarrow does not prune row groups on dictionaries.
+    table = pa.Table.from_pandas(ranks, preserve_index=False)
+    schema = pa.schema(
+        [f.with_type(f.type.value_type) if pa.types.is_dictionary(f.type) else f for f in table.schema]
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(
+        table.cast(schema),
+        path,
+        compression="zstd",
+        row_group_size=RANK_ROW_GROUP,
+    )
+    return path
+
+
+def write_rank_tables() -> dict[str, int]:
+    from src.utils.insight_stats import read_hale_frame
+    from src.utils.sahie_data import read_sahie_index
+
+    written = {}
+    hale = read_hale_frame()
+    if hale is not None:
+        # Ranked in one pass over all years, then written per year.
+        ranks = build_ranks(hale, HALE_RANK_KEYS, "val")
+        for year, part in ranks.groupby("year", sort=False):
+            written[write_ranks(part.drop(columns="year"), hale_ranks_path(year))] = len(part)
+    sahie = read_sahie_index()
+    if sahie is not None:
+        ranks = build_ranks(sahie.reset_index(), SAHIE_RANK_KEYS, "PCTUI")
+        written[write_ranks(ranks, SAHIE_RANKS_PATH)] = len(ranks)
+    return written
+
+
+def read_rank_slice(path: str, filters: list[tuple], columns: list[str]) -> pd.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    table = pq.read_table(path, columns=["fips", *columns], filters=filters)
+    return apply_schema(table.to_pandas(), RANK_SCHEMA).set_index("fips")
+
+
+@cached_dataset("hale_ranks", lambda year, *_: [hale_ranks_path(year)], max_entries=256, max_mb=16)
+@traced("load_hale_ranks")
+def load_hale_ranks(year, race: str, age: str, sex: str) -> pd.DataFrame | None:
+    filters = [("race_name", "==", race), ("sex_name", "==", sex), ("age_name", "==", age)]
+    return read_rank_slice(hale_ranks_path(year), filters, [*RANK_COLUMNS, CI_FLAG])
+
+
+@cached_dataset("sahie_ranks", lambda *_: [SAHIE_RANKS_PATH], max_entries=256, max_mb=16)
+@traced("load_sahie_ranks")
+def load_sahie_ranks(sex_code: int, age_code: int, income_code: int) -> pd.DataFrame | None:
+    filters = [("sexcat", "==", sex_code), ("agecat", "==", age_code), ("iprcat", "==", income_code)]
+    return read_rank_slice(SAHIE_RANKS_PATH, filters, RANK_COLUMNS)
+
+
+def with_ranks(df: pd.DataFrame | None, ranks: pd.DataFrame | None) -> pd.DataFrame | None:
+    # Slices are left as they are until the rank tables have been built.
+    if df is None or ranks is None:
+        return df
+    with span("join_ranks"):
+        return df.join(ranks, on="fips")
+
+
+def rank_hover(df: pd.DataFrame) -> dict[str, tuple[str, str]]:
+    # county_map hover entries for the rank columns present in a slice.
+    labels = {
+        "national_rank": f"Rank of {len(df):,} counties",
+        "state_rank": "Rank in state",
+        "national_pct": "Percentile",
+        "state_pct": "Percentile in state",
+        CI_FLAG: "CI includes national median",
+    }
+    return {
+        label: (column, "yes/no" if column == CI_FLAG else ".0f")
+        for column, label in labels.items()
+        if column in df.columns
+    }
+
+
+def rank_hover_data(df: pd.DataFrame) -> tuple[dict[str, str | bool], dict[str, str]]:
+    # The same for px.choropleth: (hover_data, labels).
+    hover = rank_hover(df)
+    hover_data = {column: True if fmt == "yes/no" else ":.0f" for column, fmt in hover.values()}
+    return hover_data, {column: label for label, (column, _) in hover.items()}
+
+
+if __name__ == "__main__":
+    # python -m src.utils.county_ranks
+    for path, rows in write_rank_tables().items():
+        print(f"{rows:>10,} rows  {path}")
@@ -0,0 +1,197 @@
+import collections
+import http.client
+import os
+import threading
+import urllib.parse
+from typing import Protocol
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from src.utils.county_density import load_county_counts
+from src.utils.county_ranks import CI_FLAG, RANK_COLUMNS, load_hale_ranks, load_sahie_ranks, with_ranks
+from src.utils.hale_data import load_hale_all_ages, load_hale_data
+from src.utils.hale_trend import load_hale_trend
+from src.utils.metrics import span
+from src.utils.sahie_data import load_sahie_slice
+
+# Where the sections get their per-selection slices. "local" loads and
+# aggregates in this process; "http" asks the slice service
+# (python -m src.cli serve-slices), so N replicas on a host share one copy of
+# the loading and groupbys instead of repeating them N times.
+DATA_BACKEND = os.environ.get("COMMONS_CARE_DATA_BACKEND", "local")
+SLICE_SERVICE_URL = os.environ.get("COMMONS_CARE_SLICE_URL", "http://127.0.0.1:8765")
+SLICE_TIMEOUT_S = 10
+# Idle keep-alive connections kept per replica.
+SLICE_POOL_SIZE = 8
+# Decoded slices kept for ETag revalidation per replica.
+SLICE_CLIENT_ENTRIES = 256
+SLICE_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+# Columns the sections read from each slice; the service sends nothing else.
+# Rank columns are only present once the rank tables have been built.
+HALE_SLICE_COLUMNS = ["fips", "location_name", "val", "upper", "lower", *RANK_COLUMNS, CI_FLAG]
+SAHIE_SLICE_COLUMNS = ["fips", "county_name", "state_name", "PCTUI", "NIPR", *RANK_COLUMNS]
+
+
+class SliceServiceError(RuntimeError):
+    pass
+
+
+def encode_slice(df: pd.DataFrame, columns: list[str] | None = None) -> bytes:
+    # zstd-compressed Arrow IPC stream. Categories are trimmed to the values
+    # present, so a slice of a shared frame does not carry its whole dictionary.
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    df = df.apply(
+        lambda c: c.cat.remove_unused_categories() if isinstance(c.dtype, pd.CategoricalDtype) else c
+    )
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_slice(body: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(body).read_all().to_pandas()
+
+
+class DataBackend(Protocol):
+    def hale_slice(self, year, race: str, age: str, sex: str) -> pd.DataFrame | None: ...
+
+    def hale_trend(self, start, end, race: str, age: str, sex: str) -> pd.DataFrame | None: ...
+
+    def sahie_slice(self, sex_code: int, age_code: int, income_code: int) -> pd.DataFrame | None: ...
+
+    def county_counts(self) -> pd.DataFrame | None: ...
+
+
+class LocalBackend:
+    # The src/utils loaders in this process, with their Streamlit caches.
+    # Slices come with their precomputed county ranks joined by FIPS.
+    def hale_slice(self, year, race: str, age: str, sex: str) -> pd.DataFrame | None:
+        if age == "All Ages":
+            df = load_hale_all_ages(year, race, sex)
+        else:
+            df = load_hale_data(year)
+            if df is None:
+                return None
+            with span("mask"):
+                df = df[(df["race_name"] == race) & (df["sex_name"] == sex) & (df["age_name"] == age)]
+        return with_ranks(df, load_hale_ranks(year, race, age, sex))
+
+    def hale_trend(self, start, end, race: str, age: str, sex: str) -> pd.DataFrame | None:
+        return load_hale_trend(start, end, race, age, sex)
+
+    def sahie_slice(self, sex_code: int, age_code: int, income_code: int) -> pd.DataFrame | None:
+        return with_ranks(
+            load_sahie_slice(sex_code, age_code, income_code), load_sahie_ranks(sex_code, age_code, income_code)
+        )
+
+    def county_counts(self) -> pd.DataFrame | None:
+        return load_county_counts()
+
+
+class HttpBackend:
+    # Slices from the slice service over a small pool of keep-alive
+    # connections. Each decoded slice is kept with its ETag, so a repeated
+    # selection is a 304 revalidation with an empty body. Returned frames are
+    # shared between sessions and must be treated as read-only.
+    def __init__(self, base_url: str = SLICE_SERVICE_URL, timeout: float = SLICE_TIMEOUT_S):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: list[http.client.HTTPConnection] = []
+        self._slices: collections.OrderedDict[str, tuple[str, pd.DataFrame]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < SLICE_POOL_SIZE:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _request(self, path: str, headers: dict) -> tuple[int, dict, bytes]:
+        # Tried once more after a dropped connection (a pooled connection the
+        # service has since closed fails on first use; a closed
+        # HTTPConnection reconnects) or a 5xx. Timeouts, malformed responses
+        # and 4xx are not retried.
+        connection = self._connection()
+        for attempt in range(2):
+            try:
+                connection.request("GET", self.prefix + path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except ConnectionError as e:
+                connection.close()
+                if attempt == 0:
+                    continue
+                raise SliceServiceError(f"Slice service at {self.host}:{self.port} unreachable: {e}") from e
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                raise SliceServiceError(f"Slice service at {self.host}:{self.port} failed: {e}") from e
+            if response.status >= 500 and attempt == 0:
+                continue
+            self._release(connection)
+            return response.status, dict(response.getheaders()), body
+
+    def _get(self, path: str, **params) -> pd.DataFrame | None:
+        path = f"{path}?{urllib.parse.urlencode(params)}" if params else path
+        with self._lock:
+            cached = self._slices.get(path)
+        headers = {"Accept": SLICE_CONTENT_TYPE}
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        with span("slice_request", cache="miss") as record:
+            status, response_headers, body = self._request(path, headers)
+            record["bytes"] = len(body)
+            if status == 304:
+                record["cache"] = "hit"
+        if status == 304 and cached is not None:
+            with self._lock:
+                self._slices.move_to_end(path)
+            return cached[1]
+        if status == 404:
+            return None
+        if status != 200:
+            raise SliceServiceError(f"GET {path}: {status} {body.decode(errors='replace')[:200]}")
+        df = decode_slice(body)
+        etag = response_headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._slices[path] = (etag, df)
+                self._slices.move_to_end(path)
+                while len(self._slices) > SLICE_CLIENT_ENTRIES:
+                    self._slices.popitem(last=False)
+        return df
+
+    def hale_slice(self, year, race: str, age: str, sex: str) -> pd.DataFrame | None:
+        return self._get(f"/hale/{year}", race=race, age=age, sex=sex)
+
+    def hale_trend(self, start, end, race: str, age: str, sex: str) -> pd.DataFrame | None:
+        return self._get(f"/hale-trend/{start}/{end}", race=race, age=age, sex=sex)
+
+    def sahie_slice(self, sex_code: int, age_code: int, income_code: int) -> pd.DataFrame | None:
+        return self._get("/sahie", sex=sex_code, age=age_code, income=income_code)
+
+    def county_counts(self) -> pd.DataFrame | None:
+        return self._get("/county-counts")
+
+
+BACKENDS = {"local": LocalBackend, "http": HttpBackend}
+
+
+@st.cache_resource(show_spinner=False)
+def load_data_backend() -> DataBackend:
+    if DATA_BACKEND not in BACKENDS:
+        raise ValueError(f"COMMONS_CARE_DATA_BACKEND must be one of {sorted(BACKENDS)}, got {DATA_BACKEND!r}")
+    return BACKENDS[DATA_BACKEND]()
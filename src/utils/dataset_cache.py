@@ -0,0 +1,282 @@
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable
+from src.utils.metrics import cache_outcome
+
+# Process-wide cache for the dataset loaders, keyed on the identity of their
+# source files as well as their arguments. A loader's entry is reused while
+# its sources keep the same content hash (or size and mtime, for files above
+# DATASET_HASH_MAX_MB); a new data drop is loaded on the next call, without a
+# restart. Each dataset caps its entries (e.g. HALE years resident), and all
+# entries share one byte budget with LRU eviction. Values are shared between
+# sessions, like cache_resource: callers must treat them as read-only.
+DATASET_CACHE_MAX_MB = float(os.environ.get("COMMONS_CARE_DATASET_CACHE_MB", 2048))
+# Sources are stat()ed at most this often per path.
+DATASET_CHECK_INTERVAL_S = 2.0
+# Larger files (the OSM extract) are identified by size and mtime only.
+DATASET_HASH_MAX_MB = 512
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def value_bytes(value) -> int:
+    # pandas is imported here, not at module level: app.py imports this
+    # module before first paint, and any frame to size was made by a loader
+    # that has already imported it.
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(value_bytes(v) for v in value)
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, default=str))
+    return sys.getsizeof(value)
+
+
+class DatasetCache:
+    def __init__(self, max_mb: float = DATASET_CACHE_MAX_MB):
+        self.max_bytes = int(max_mb * 2**20)
+        # (name, key) -> (identity, value, bytes, sources)
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._bytes = 0
+        # name -> [entries, bytes]
+        self._usage: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        # path -> (checked at, (size, mtime_ns, sha256 or None) or None)
+        self._fingerprints: dict[str, tuple[float, tuple | None]] = {}
+        self._callbacks: dict[str, list[Callable[[], None]]] = defaultdict(list)
+        self._loading: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._refreshed = 0.0
+        self.hits = self.misses = self.reloads = self.evictions = 0
+
+    def _fingerprint(self, path: str) -> tuple | None:
+        now = time.monotonic()
+        with self._lock:
+            checked = self._fingerprints.get(path)
+        if checked and now - checked[0] < DATASET_CHECK_INTERVAL_S:
+            return checked[1]
+        previous = checked[1] if checked else None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            fingerprint = None
+        else:
+            size, mtime = stat.st_size, stat.st_mtime_ns
+            if previous and previous[:2] == (size, mtime):
+                fingerprint = previous
+            elif size > DATASET_HASH_MAX_MB * 2**20:
+                fingerprint = (size, mtime, None)
+            else:
+                fingerprint = (size, mtime, file_sha256(path))
+        with self._lock:
+            self._fingerprints[path] = (now, fingerprint)
+        return fingerprint
+
+    def identity(self, sources: list[str]) -> tuple:
+        # Content hash where there is one, so a file that was only touched or
+        # rewritten unchanged keeps its entries.
+        identity = []
+        for path in sources:
+            fingerprint = self._fingerprint(path)
+            identity.append(fingerprint and (fingerprint[2] or fingerprint[:2]))
+        return tuple(identity)
+
+    def get(
+        self,
+        name: str,
+        key: tuple,
+        sources: list[str],
+        load: Callable[[], object],
+        max_entries: int = 1,
+        max_mb: float | None = None,
+    ):
+        identity = self.identity(sources)
+        entry_key = (name, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] == identity:
+                self.hits += 1
+                self._entries.move_to_end(entry_key)
+                cache_outcome("hit")
+                return entry[1]
+            loading = self._loading.setdefault(entry_key, threading.Lock())
+        # One load per key at a time; concurrent callers wait for it.
+        with loading:
+            try:
+                with self._lock:
+                    entry = self._entries.get(entry_key)
+                    if entry is not None and entry[0] == identity:
+                        self.hits += 1
+                        self._entries.move_to_end(entry_key)
+                        cache_outcome("hit")
+                        return entry[1]
+                cache_outcome("miss")
+                value = load()
+                with self._lock:
+                    self.misses += 1
+                    stale = entry is not None
+                    if stale:
+                        self.reloads += 1
+                    self._store(entry_key, identity, sources, value, max_entries, max_mb)
+            finally:
+                # Later callers find the entry (or load again); the lock is
+                # only needed while a load is in flight.
+                with self._lock:
+                    if self._loading.get(entry_key) is loading:
+                        del self._loading[entry_key]
+        if stale:
+            self._notify([name])
+        return value
+
+    def _store(
+        self, entry_key: tuple, identity: tuple, sources: list[str], value, max_entries: int, max_mb: float | None
+    ) -> None:
+        name = entry_key[0]
+        self._remove(entry_key)
+        size = value_bytes(value)
+        dataset_max = int(max_mb * 2**20) if max_mb is not None else self.max_bytes
+        # A value larger than its budget is returned uncached.
+        if size > min(dataset_max, self.max_bytes):
+            return
+        self._entries[entry_key] = (identity, value, size, sources)
+        self._usage[name][0] += 1
+        self._usage[name][1] += size
+        self._bytes += size
+        usage = self._usage[name]
+        while usage[0] > max_entries or usage[1] > dataset_max:
+            oldest = next(k for k in self._entries if k[0] == name)
+            self._remove(oldest)
+            self.evictions += 1
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, entry_key: tuple) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        usage = self._usage[entry_key[0]]
+        usage[0] -= 1
+        usage[1] -= entry[2]
+        self._bytes -= entry[2]
+
+    def refresh(self) -> None:
+        # Re-checks the sources of every entry and drops the changed ones, so
+        # caches built on top (figures) are invalidated even while their
+        # loaders are not being called. Runs at most once per check interval.
+        now = time.monotonic()
+        with self._lock:
+            if now - self._refreshed < DATASET_CHECK_INTERVAL_S:
+                return
+            self._refreshed = now
+            entries = [(k, e[0], e[3]) for k, e in self._entries.items()]
+        changed = set()
+        for entry_key, identity, sources in entries:
+            if self.identity(sources) != identity:
+                with self._lock:
+                    self._remove(entry_key)
+                    self.reloads += 1
+                changed.add(entry_key[0])
+        if changed:
+            self._notify(changed)
+
+    def on_reload(self, name: str, callback: Callable[[], None]) -> None:
+        # For derived caches (figures, encoded slices): called when an entry
+        # of the dataset was replaced because its sources changed, or on reload().
+        with self._lock:
+            self._callbacks[name].append(callback)
+
+    def _notify(self, names) -> None:
+        with self._lock:
+            callbacks = [c for name in names for c in self._callbacks.get(name, [])]
+        for callback in callbacks:
+            callback()
+
+    def reload(self, *names: str) -> None:
+        # Explicit reload hook: drops the datasets' entries (all datasets
+        # without names) and re-checks every source on the next call.
+        with self._lock:
+            names = names or tuple({*self._usage, *self._callbacks})
+            for entry_key in [k for k in self._entries if k[0] in names]:
+                self._remove(entry_key)
+            self._fingerprints.clear()
+            self.reloads += 1
+        self._notify(names)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "mb": self._bytes / 2**20,
+                "max_mb": self.max_bytes / 2**20,
+                "datasets": {
+                    name: {"entries": entries, "mb": size / 2**20}
+                    for name, (entries, size) in sorted(self._usage.items())
+                    if entries
+                },
+            }
+
+
+DATASETS = DatasetCache()
+
+
+def cached_dataset(
+    name: str,
+    sources: Callable[..., list[str]],
+    max_entries: int = 1,
+    max_mb: float | None = None,
+):
+    # Replaces @st.cache_data / @st.cache_resource on a loader; @traced goes
+    # below it. sources is called with the loader's arguments, keywords
+    # included, so it takes the loader's signature and ignores what does not
+    # change the files (lambda *_: [...] when there are only positionals).
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return DATASETS.get(
+                name,
+                (args, tuple(sorted(kwargs.items()))),
+                sources(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                max_entries,
+                max_mb,
+            )
+
+        wrapper.reload = lambda: DATASETS.reload(name)
+        return wrapper
+
+    return decorator
+
+
+def on_reload(name: str, callback: Callable[[], None]) -> None:
+    DATASETS.on_reload(name, callback)
+
+
+def refresh_datasets() -> None:
+    DATASETS.refresh()
+
+
+def reload_datasets(*names: str) -> None:
+    DATASETS.reload(*names)
+
+
+def dataset_stats() -> dict:
+    return DATASETS.stats()
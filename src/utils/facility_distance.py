@@ -0,0 +1,108 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.access_options import HEALTH_AMENITIES
+from src.utils.county_geometry import load_county_centroids
+from src.utils.dataset_cache import cached_dataset
+from src.utils.health_access_pois import POI_CACHE_PATH, load_hospital_pois, poi_source_hash
+from src.utils.metrics import traced
+
+FACILITY_DISTANCE_PATH = "./data/artifacts/facility_distance.parquet"
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 25.0
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    # Points on the unit sphere: euclidean chord length is monotonic in
+    # great-circle distance, so a plain KD-tree answers haversine queries.
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+    )
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+
+def nearest_facilities(
+    pois: pd.DataFrame, centroids: pd.DataFrame, radius_km: float = DEFAULT_RADIUS_KM
+) -> pd.DataFrame:
+    from scipy.spatial import cKDTree
+
+    targets = unit_vectors(centroids["lat"], centroids["lon"])
+    radius = km_to_chord(radius_km)
+    frames = []
+    for amenity in HEALTH_AMENITIES:
+        subset = pois[pois["amenity"] == amenity]
+        if subset.empty:
+            continue
+        tree = cKDTree(unit_vectors(subset["lat"], subset["lon"]))
+        chord, _ = tree.query(targets, k=1)
+        counts = tree.query_ball_point(targets, r=radius, return_length=True)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "fips": centroids["fips"].to_numpy(),
+                    "amenity": amenity,
+                    "nearest_km": chord_to_km(chord).astype("float32"),
+                    "count_within": np.asarray(counts, dtype="int32"),
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=["fips", "amenity", "nearest_km", "count_within"])
+    result = pd.concat(frames, ignore_index=True)
+    result["amenity"] = result["amenity"].astype("category")
+    return result
+
+
+def _cache_key(radius_km: float) -> dict[bytes, bytes]:
+    return {
+        b"poi_sha256": (poi_source_hash() or "").encode(),
+        b"radius_km": str(radius_km).encode(),
+    }
+
+
+def read_facility_distance(radius_km: float = DEFAULT_RADIUS_KM) -> pd.DataFrame | None:
+    # load_hospital_pois refreshes the POI manifest the cache key is read from.
+    pois = load_hospital_pois()
+    centroids = load_county_centroids()
+    if pois is None or centroids is None:
+        return None
+
+    key = _cache_key(radius_km)
+    if os.path.exists(FACILITY_DISTANCE_PATH):
+        metadata = pq.read_schema(FACILITY_DISTANCE_PATH).metadata or {}
+        if all(metadata.get(k) == v for k, v in key.items()):
+            return pd.read_parquet(FACILITY_DISTANCE_PATH)
+
+    result = nearest_facilities(pois, centroids, radius_km)
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **key})
+    os.makedirs(os.path.dirname(FACILITY_DISTANCE_PATH), exist_ok=True)
+    pq.write_table(table, FACILITY_DISTANCE_PATH, compression="zstd")
+    return result
+
+
+@cached_dataset("facility_distance", lambda *_: [POI_CACHE_PATH], max_entries=4)
+@traced("load_facility_distance")
+def load_facility_distance(radius_km: float = DEFAULT_RADIUS_KM) -> pd.DataFrame | None:
+    return read_facility_distance(radius_km)
+
+
+def distance_summary(distance: pd.DataFrame, amenities: list[str]) -> pd.DataFrame:
+    # Nearest of any selected type, and all selected facilities within the radius.
+    selected = distance[distance["amenity"].isin(amenities)]
+    return (
+        selected.groupby("fips", sort=False)
+        .agg(nearest_km=("nearest_km", "min"), count_within=("count_within", "sum"))
+        .reset_index()
+    )
@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from src.utils.metrics import annotate, span
+
+# plotly_chart_spec builds st.plotly_chart's element itself from Streamlit
+# internals, checked against this release by tests/test_figure_cache.py
+# (requirements.txt pins it). Any other release takes the public path.
+PLOTLY_SPEC_STREAMLIT_VERSION = "1.45.0"
+try:
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+except ImportError:
+    PlotlyChartProto = None
+
+# Serialized choropleth JSON keyed by (section, filter tuple). Toggling back
+# to a recent selection skips the data slice, px.choropleth and the
+# serialization: the stored spec is sent to the browser as it is
+# (plotly_chart_spec). A go.Figure would hold its own copy of the county
+# GeoJSON, about 16 MB per entry at full size.
+FIGURE_CACHE_MAX_MB = 64
+FIGURE_POPULARITY_PATH = "./output/figure_popularity.json"
+POPULARITY_FLUSH_EVERY = 25
+# Most requested combinations per section pre-rendered when the section is
+# first loaded; 0 disables the warm-up.
+WARM_UP_TOP_N = 8
+# Warm-up and prefetch threads run under the ScriptRunContext of the script
+# run that started them. The st.cache_* loaders they reach do not show a
+# spinner, so nothing is drawn into that session.
+BACKGROUND_THREAD_PREFIX = "figure-"
+
+
+def _popularity_key(section: str, filters: tuple) -> str:
+    return json.dumps([section, *filters])
+
+
+class FigureCache:
+    def __init__(self, max_mb: float = FIGURE_CACHE_MAX_MB, popularity_path: str = FIGURE_POPULARITY_PATH):
+        self.max_bytes = int(max_mb * 2**20)
+        self.popularity_path = popularity_path
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._builders: dict[str, Callable[..., go.Figure | None]] = {}
+        self.hits = self.misses = self.evictions = 0
+        self.popularity = Counter(self._read_popularity())
+        self._unsaved = 0
+
+    def get(self, section: str, filters: tuple) -> str | None:
+        key = (section, *filters)
+        with self._lock:
+            self._count(section, filters)
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return spec
+
+    def put(self, section: str, filters: tuple, fig: go.Figure) -> str:
+        with span("serialize") as record:
+            spec = pio.to_json(fig, validate=False)
+            record["bytes"] = len(spec)
+        key = (section, *filters)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            # A single figure larger than the whole budget is returned uncached.
+            if len(spec) <= self.max_bytes:
+                self._entries[key] = spec
+                self._bytes += len(spec)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return spec
+
+    def contains(self, section: str, filters: tuple) -> bool:
+        # Unlike get(), not counted as a request.
+        with self._lock:
+            return (section, *filters) in self._entries
+
+    def invalidate(self, section: str) -> int:
+        # Drops a section's figures once the data behind them has changed.
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == section]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key))
+        return len(stale)
+
+    def builder(self, section: str) -> Callable[..., go.Figure | None] | None:
+        return self._builders.get(section)
+
+    def spec(self, section: str, filters: tuple) -> str | None:
+        with span("figure_cache", cache="miss") as record:
+            spec = self.get(section, filters)
+            if spec is not None:
+                record.update(cache="hit", bytes=len(spec))
+            return spec
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "mb": self._bytes / 2**20,
+                "max_mb": self.max_bytes / 2**20,
+            }
+
+    def _count(self, section: str, filters: tuple) -> None:
+        self.popularity[_popularity_key(section, filters)] += 1
+        self._unsaved += 1
+        if self._unsaved >= POPULARITY_FLUSH_EVERY:
+            self._unsaved = 0
+            self._write_popularity(dict(self.popularity))
+
+    def _read_popularity(self) -> dict[str, int]:
+        if os.path.exists(self.popularity_path):
+            with open(self.popularity_path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def _write_popularity(self, counts: dict[str, int]) -> None:
+        os.makedirs(os.path.dirname(self.popularity_path), exist_ok=True)
+        tmp = f"{self.popularity_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(counts, f)
+        os.replace(tmp, self.popularity_path)
+
+    def popular(self, section: str, n: int) -> list[tuple]:
+        with self._lock:
+            ranked = self.popularity.most_common()
+        top = []
+        for key, _ in ranked:
+            name, *filters = json.loads(key)
+            if name == section:
+                top.append(tuple(filters))
+                if len(top) == n:
+                    break
+        return top
+
+    def register(self, section: str, build: Callable[..., go.Figure | None], top_n: int = WARM_UP_TOP_N) -> None:
+        # Called once per process when a section module is imported.
+        with self._lock:
+            if section in self._builders:
+                return
+            self._builders[section] = build
+        if top_n > 0:
+            thread = threading.Thread(
+                target=self.warm_up,
+                args=(section, top_n),
+                name=f"{BACKGROUND_THREAD_PREFIX}warm-up-{section}",
+                daemon=True,
+            )
+            add_script_run_ctx(thread, get_script_run_ctx(suppress_warning=True))
+            thread.start()
+
+    def warm_up(self, section: str, top_n: int = WARM_UP_TOP_N) -> int:
+        build = self._builders[section]
+        built = 0
+        for filters in self.popular(section, top_n):
+            if self.contains(section, filters):
+                continue
+            with span("warm_up", section=section):
+                fig = build(*filters)
+                if fig is not None:
+                    self.put(section, filters, fig)
+                    built += 1
+        return built
+
+
+@st.cache_resource
+def load_figure_cache() -> FigureCache:
+    return FigureCache()
+
+
+def plotly_chart_spec(spec: str, use_container_width: bool = True) -> None:
+    # st.plotly_chart for an already serialized figure. st.plotly_chart itself
+    # would copy, re-validate and re-serialize it, which takes longer than
+    # building the figure again. Mirrors its non-selection path in
+    # PLOTLY_SPEC_STREAMLIT_VERSION.
+    annotate(bytes=len(spec))
+    if PlotlyChartProto is None or st.__version__ != PLOTLY_SPEC_STREAMLIT_VERSION:
+        st.plotly_chart(pio.from_json(spec, skip_invalid=True), use_container_width=use_container_width)
+        return
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(st._main)
+    proto.spec = spec
+    proto.config = json.dumps({"showLink": False, "linkText": False})
+    proto.id = compute_and_register_element_id(
+        "plotly_chart",
+        user_key=None,
+        form_id=proto.form_id,
+        plotly_spec=proto.spec,
+        plotly_config=proto.config,
+        selection_mode=("points", "box", "lasso"),
+        is_selection_activated=False,
+        theme="streamlit",
+        use_container_width=use_container_width,
+    )
+    st._main._enqueue("plotly_chart", proto)
@@ -0,0 +1,68 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.hale_options import YEAR_OPTIONS
+from src.utils.hale_store import HALE_COLUMNS, read_hale_csv, read_hale_store
+from src.utils.schemas import HALE_SCHEMA, apply_schema
+
+HALE_CUBE_PATH = "./data/artifacts/hale_all_ages.parquet"
+
+# "All Ages" view: county means over every age group, one row per key.
+CUBE_KEYS = ["year", "race_name", "sex_name", "fips"]
+
+
+def read_all_years() -> pd.DataFrame | None:
+    df = read_hale_store(columns=[*HALE_COLUMNS, "year"])
+    if df is None:
+        frames = []
+        for year in YEAR_OPTIONS:
+            year_df = read_hale_csv(year, HALE_COLUMNS)
+            if year_df is not None:
+                frames.append(year_df.assign(year=int(year)))
+        if not frames:
+            return None
+        # Per-year categories differ, so concat falls back to object labels.
+        df = pd.concat(frames, ignore_index=True)
+    return apply_schema(df.astype({"year": "int32"}), HALE_SCHEMA)
+
+
+def build_all_ages_cube(df: pd.DataFrame) -> pd.DataFrame:
+    # One grouped pass covers every year x race x sex combination.
+    return (
+        df.groupby(CUBE_KEYS, sort=True, observed=True)
+        .agg(
+            val=("val", "mean"),
+            upper=("upper", "mean"),
+            lower=("lower", "mean"),
+            location_name=("location_name", "first"),
+        )
+        .reset_index()
+    )
+
+
+def write_all_ages_cube(path: str = HALE_CUBE_PATH) -> str | None:
+    df = read_all_years()
+    if df is None:
+        return None
+    cube = build_all_ages_cube(df)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(cube, preserve_index=False), path, compression="zstd")
+    return path
+
+
+def read_all_ages_cube(path: str = HALE_CUBE_PATH) -> pd.DataFrame | None:
+    # Built by the ingest only: building it here would scan every HALE year
+    # inside a request.
+    if not os.path.exists(path):
+        return None
+    cube = apply_schema(pd.read_parquet(path), HALE_SCHEMA)
+    return cube.set_index(CUBE_KEYS).sort_index()
+
+
+def all_ages_slice(cube: pd.DataFrame, year, race: str, sex: str) -> pd.DataFrame:
+    key = (int(year), race, sex)
+    try:
+        return cube.loc[key].reset_index()
+    except KeyError:
+        return cube.iloc[:0].reset_index()
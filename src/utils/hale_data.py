@@ -1,25 +1,72 @@
 import os
 import pandas as pd
 import json
-import streamlit as st
+from src.utils.dataset_cache import cached_dataset
+from src.utils.hale_cube import HALE_CUBE_PATH, all_ages_slice, read_all_ages_cube
+from src.utils.hale_store import (
+    HALE_COLUMNS,
+    hale_csv_path,
+    hale_partition_path,
+    read_hale_csv,
+    read_hale_store,
+)
+from src.utils.metrics import traced
+from src.utils.schemas import SCHEMA_VERSION
+from src.utils.shared_datasets import shared_frame
 
+HALE_INSIGHTS_PATH = "./output/hale-insights.json"
+# Single-year HALE frames kept resident per process.
+HALE_YEARS_RESIDENT = 4
 
-@st.cache_data
-def load_hale_data(year: int) -> pd.DataFrame | None:
-    path = (
-        f"./data/IHME_USA_HALE_COUNTY_RACE_ETHNICITY_2009_2019_HALE_BOTH/"
-        f"IHME_USA_HALE_COUNTY_RACE_ETHNICITY_2009_2019_HALE_{year}_BOTH_Y2025M03D24.CSV"
+
+def hale_sources(year, columns=None) -> list[str]:
+    # load_hale_data's signature (see cached_dataset); columns are read from the same files.
+    return [hale_partition_path(year), hale_csv_path(year)]
+
+
+def read_hale_year(year: int) -> pd.DataFrame | None:
+    df = read_hale_store(years=[year], columns=HALE_COLUMNS)
+    if df is None:
+        # Store not built yet (python -m src.utils.hale_store); fall back to the raw CSV.
+        df = read_hale_csv(year, HALE_COLUMNS)
+    return df
+
+
+# Frames below are memory-mapped from data/shared and handed out without
+# copying, so callers must treat them as read-only. The dataset cache reloads
+# them when their source files change.
+@cached_dataset("hale_data", hale_sources, max_entries=HALE_YEARS_RESIDENT)
+@traced("load_hale_data")
+def load_hale_data(year: int, columns: tuple[str, ...] | None = None) -> pd.DataFrame | None:
+    df = shared_frame(
+        f"hale-{int(year)}.v{SCHEMA_VERSION}",
+        lambda: read_hale_year(year),
+        hale_sources(year),
     )
-    if os.path.exists(path):
-        df = pd.read_csv(path)
-        df = df[df["fips"].notna()]
-        df["fips"] = df["fips"].astype(float).astype(int).astype(str).str.zfill(5)
+    if df is None or columns is None:
         return df
-    return None
+    return df[list(columns)]
+
+
+@cached_dataset("hale_all_ages_cube", lambda: [HALE_CUBE_PATH])
+@traced("load_hale_all_ages_cube")
+def load_hale_all_ages_cube() -> pd.DataFrame | None:
+    return shared_frame(f"hale-all-ages.v{SCHEMA_VERSION}", read_all_ages_cube, [HALE_CUBE_PATH])
+
+
+@cached_dataset("hale_all_ages", lambda *_: [HALE_CUBE_PATH], max_entries=256, max_mb=64)
+@traced("load_hale_all_ages")
+def load_hale_all_ages(year: int, race: str, sex: str) -> pd.DataFrame | None:
+    cube = load_hale_all_ages_cube()
+    if cube is None:
+        return None
+    return all_ages_slice(cube, year, race, sex)
+
 
-@st.cache_data 
+@cached_dataset("hale_insights", lambda: [HALE_INSIGHTS_PATH])
+@traced("load_hale_insights")
 def load_hale_insights() -> dict | None:
-    path = "./output/hale-insights.json"
+    path = HALE_INSIGHTS_PATH
 
     if os.path.exists(path):
         with open(path, "r") as f:
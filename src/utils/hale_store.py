@@ -0,0 +1,116 @@
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.hale_options import YEAR_OPTIONS
+from src.utils.schemas import HALE_SCHEMA, apply_schema, fips_code
+
+HALE_CSV_DIR = "./data/IHME_USA_HALE_COUNTY_RACE_ETHNICITY_2009_2019_HALE_BOTH"
+HALE_CSV_NAME = "IHME_USA_HALE_COUNTY_RACE_ETHNICITY_2009_2019_HALE_{year}_BOTH_Y2025M03D24.CSV"
+HALE_STORE_DIR = "./data/artifacts/hale"
+
+# Columns the dashboard actually reads; everything else in the IHME export is dropped.
+HALE_COLUMNS = [
+    "fips",
+    "location_name",
+    "race_name",
+    "sex_name",
+    "age_name",
+    "val",
+    "upper",
+    "lower",
+]
+
+# Rows are sorted on these before writing so parquet row-group statistics
+# let filtered reads skip most of a partition.
+HALE_SORT_KEYS = ["race_name", "sex_name", "age_name", "fips"]
+
+# Label columns are stored as plain strings, because pyarrow does not prune
+# row groups on dictionary-typed columns. read_dictionary turns them back
+# into categoricals on read.
+HALE_LABELS = ["location_name", "race_name", "sex_name", "age_name"]
+
+
+def hale_csv_path(year, csv_dir: str = HALE_CSV_DIR) -> str:
+    return os.path.join(csv_dir, HALE_CSV_NAME.format(year=year))
+
+
+def hale_partition_path(year, store_dir: str = HALE_STORE_DIR) -> str:
+    return os.path.join(store_dir, f"year={int(year)}", "part-0.parquet")
+
+
+def read_hale_csv(
+    year, columns: list[str] | None = None, csv_dir: str = HALE_CSV_DIR
+) -> pd.DataFrame | None:
+    path = hale_csv_path(year, csv_dir)
+    if not os.path.exists(path):
+        return None
+    usecols = list(dict.fromkeys(["fips", *(columns or HALE_COLUMNS)]))
+    df = pd.read_csv(path, usecols=usecols)
+    df = df[df["fips"].notna()].copy()
+    df["fips"] = fips_code(df["fips"])
+    return apply_schema(df, HALE_SCHEMA)
+
+
+def read_hale_store(
+    years=None,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    store_dir: str = HALE_STORE_DIR,
+) -> pd.DataFrame | None:
+    if not os.path.isdir(store_dir):
+        return None
+    if years is not None:
+        years = [int(y) for y in years]
+        missing = [y for y in years if not os.path.exists(hale_partition_path(y, store_dir))]
+        if missing:
+            return None
+        filters = [("year", "in", years), *(filters or [])]
+    table = pq.read_table(
+        store_dir,
+        columns=columns,
+        filters=filters or None,
+        partitioning="hive",
+        read_dictionary=[c for c in HALE_LABELS if columns is None or c in columns],
+    )
+    # Partitions written before the declared schema hold object/float64 columns.
+    return apply_schema(table.to_pandas(), HALE_SCHEMA)
+
+
+def write_hale_partition(df: pd.DataFrame, year, store_dir: str = HALE_STORE_DIR) -> str:
+    df = df[HALE_COLUMNS].sort_values(HALE_SORT_KEYS, ignore_index=True)
+    df = df.astype({c: object for c in HALE_LABELS})
+    path = hale_partition_path(year, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(
+        pa.Table.from_pandas(df, preserve_index=False),
+        path,
+        compression="zstd",
+        row_group_size=32_768,
+    )
+    return path
+
+
+def build_hale_store(
+    csv_dir: str = HALE_CSV_DIR,
+    store_dir: str = HALE_STORE_DIR,
+    years=YEAR_OPTIONS,
+) -> list[str]:
+    written = []
+    for year in years:
+        df = read_hale_csv(year, HALE_COLUMNS, csv_dir)
+        if df is None:
+            print(f"Skipping {year}: {hale_csv_path(year, csv_dir)} not found.")
+            continue
+        written.append(write_hale_partition(df, year, store_dir))
+    return written
+
+
+if __name__ == "__main__":
+    # python -m src.utils.hale_store [csv_dir] [store_dir]
+    from src.utils.hale_cube import write_all_ages_cube
+
+    paths = build_hale_store(*sys.argv[1:3])
+    print(f"Wrote {len(paths)} HALE partitions.")
+    print(f"Wrote All Ages cube to {write_all_ages_cube()}.")
@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import pandas as pd
+from src.utils.dataset_cache import cached_dataset
+from src.utils.hale_cube import HALE_CUBE_PATH
+from src.utils.hale_data import hale_sources, load_hale_all_ages_cube
+from src.utils.hale_options import YEAR_OPTIONS
+from src.utils.hale_store import hale_partition_path, read_hale_csv, read_hale_store
+from src.utils.metrics import traced
+
+TREND_COLUMNS = ["fips", "location_name", "val", "year"]
+
+
+def read_hale_span(years, race: str, age: str, sex: str) -> pd.DataFrame | None:
+    # One dataset scan over the year partitions that exist; the demographic
+    # filters are pushed down so only the matching row groups are decoded.
+    years = [int(y) for y in years]
+    stored = [y for y in years if os.path.exists(hale_partition_path(y))]
+    filters = [("race_name", "==", race), ("sex_name", "==", sex), ("age_name", "==", age)]
+    frames = []
+    if stored:
+        frames.append(read_hale_store(years=stored, columns=TREND_COLUMNS, filters=filters))
+    # Years not ingested yet (python -m src.cli ingest); one CSV parse each.
+    for year in years:
+        if year in stored:
+            continue
+        year_df = read_hale_csv(year)
+        if year_df is None:
+            continue
+        mask = (
+            (year_df["race_name"] == race)
+            & (year_df["sex_name"] == sex)
+            & (year_df["age_name"] == age)
+        )
+        frames.append(year_df.loc[mask, TREND_COLUMNS[:-1]].assign(year=year))
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).astype({"year": "int32"})
+
+
+def all_ages_span(cube: pd.DataFrame, years, race: str, sex: str) -> pd.DataFrame:
+    try:
+        span = cube.xs((race, sex), level=("race_name", "sex_name")).reset_index()
+    except KeyError:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+    return span.loc[span["year"].isin([int(y) for y in years]), TREND_COLUMNS]
+
+
+def county_trends(df: pd.DataFrame) -> pd.DataFrame:
+    # County x year matrix, then delta and least-squares slope for every
+    # county at once. Missing years are masked out of each county's fit.
+    values = df.pivot_table(index="fips", columns="year", values="val", aggfunc="first", observed=True)
+    years = values.columns.to_numpy(np.float64)
+    y = values.to_numpy(np.float64)
+    present = ~np.isnan(y)
+    n = present.sum(axis=1)
+    x = np.where(present, years, np.nan)
+    x_centered = x - np.nanmean(x, axis=1, keepdims=True)
+    y_centered = y - np.nanmean(y, axis=1, keepdims=True)
+    sxx = np.nansum(x_centered**2, axis=1)
+    sxy = np.nansum(x_centered * y_centered, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(n >= 2, sxy / sxx, np.nan)
+
+    first = np.argmax(present, axis=1)
+    last = y.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    rows = np.arange(len(y))
+    names = df.drop_duplicates("fips").set_index("fips")["location_name"]
+    return pd.DataFrame(
+        {
+            "fips": values.index.to_numpy(),
+            "location_name": names.reindex(values.index).to_numpy(),
+            "start_year": years[first].astype("int32"),
+            "end_year": years[last].astype("int32"),
+            "start_val": y[rows, first].astype("float32"),
+            "end_val": y[rows, last].astype("float32"),
+            "delta": (y[rows, last] - y[rows, first]).astype("float32"),
+            "slope": slope.astype("float32"),
+            "years": n.astype("int8"),
+        }
+    )
+
+
+def trend_years(start, end) -> list[str]:
+    return [y for y in YEAR_OPTIONS if int(start) <= int(y) <= int(end)]
+
+
+def trend_sources(start, end, race: str, age: str, sex: str) -> list[str]:
+    if age == "All Ages":
+        return [HALE_CUBE_PATH]
+    return [path for year in trend_years(start, end) for path in hale_sources(year)]
+
+
+@cached_dataset("hale_trend", trend_sources, max_entries=128, max_mb=64)
+@traced("load_hale_trend")
+def load_hale_trend(start, end, race: str, age: str, sex: str) -> pd.DataFrame | None:
+    years = trend_years(start, end)
+    if age == "All Ages":
+        cube = load_hale_all_ages_cube()
+        span = None if cube is None else all_ages_span(cube, years, race, sex)
+    else:
+        span = read_hale_span(years, race, age, sex)
+    if span is None:
+        return None
+    if span.empty:
+        return span
+    return county_trends(span)
@@ -1,12 +1,125 @@
-from pyrosm import OSM
-import streamlit as st
-
-
-@st.cache_data
-def load_hospital_pois():
-    osm = OSM("data/health_filtered.osm.pbf")
-    pois = osm.get_pois()
-    pois = pois[pois.geometry.type == "Point"].copy()
-    pois["lon"] = pois.geometry.x
-    pois["lat"] = pois.geometry.y
-    return pois
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.dataset_cache import cached_dataset, file_sha256
+from src.utils.metrics import traced
+from src.utils.osm_extract import POI_EXTRACT_WORKERS, extract_health_pois
+from src.utils.shared_datasets import shared_frame
+
+# The pre-filtered extract, a full national one or a directory of per-state
+# extracts; see osm_extract. The cache is only built offline
+# (python -m src.cli extract-pois), never while a page renders.
+POI_PBF_PATH = os.environ.get("COMMONS_CARE_POI_PBF", "data/health_filtered.osm.pbf")
+POI_CACHE_PATH = "./data/artifacts/pois.parquet"
+POI_MANIFEST_PATH = "./data/artifacts/pois.manifest.json"
+POI_COLUMNS = ["amenity", "name", "lat", "lon"]
+
+
+def source_files(path: str) -> list[str]:
+    if os.path.isdir(path):
+        return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".osm.pbf")]
+    return [path]
+
+
+def source_fingerprint(path: str, previous: dict | None = None) -> dict:
+    stats = [os.stat(f) for f in source_files(path)]
+    fingerprint = {
+        "files": len(stats),
+        "size": sum(stat.st_size for stat in stats),
+        "mtime_ns": max((stat.st_mtime_ns for stat in stats), default=0),
+    }
+    # Hashing the pbf is the expensive part, so reuse the recorded hash while
+    # size and mtime are unchanged.
+    if previous and all(previous.get(k) == v for k, v in fingerprint.items()):
+        fingerprint["sha256"] = previous["sha256"]
+    elif not os.path.isdir(path):
+        fingerprint["sha256"] = file_sha256(path)
+    else:
+        # A directory of per-state extracts: a hash over the files' hashes.
+        lines = [f"{os.path.basename(f)}:{file_sha256(f)}\n" for f in source_files(path)]
+        fingerprint["sha256"] = hashlib.sha256("".join(lines).encode()).hexdigest()
+    return fingerprint
+
+
+def _read_manifest(path: str = POI_MANIFEST_PATH) -> dict | None:
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return None
+
+
+def _write_manifest(manifest: dict, path: str = POI_MANIFEST_PATH) -> None:
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def poi_source_hash() -> str | None:
+    manifest = _read_manifest()
+    return manifest["source"]["sha256"] if manifest else None
+
+
+def compact_pois(pois: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "amenity": pois["amenity"].astype("category"),
+            "name": pois["name"].astype("string"),
+            "lat": pois["lat"].astype("float32"),
+            "lon": pois["lon"].astype("float32"),
+        }
+    ).reset_index(drop=True)
+
+
+def extract_pois(pbf_path: str = POI_PBF_PATH, workers: int = POI_EXTRACT_WORKERS, verbose: bool = False) -> pd.DataFrame:
+    # osmium, pyrosm and shapely are only needed when the cache is rebuilt.
+    # Buildings and campuses are kept as their centroids.
+    return compact_pois(extract_health_pois(pbf_path, workers=workers, verbose=verbose))
+
+
+def write_poi_cache(pois: pd.DataFrame, source: dict, path: str = POI_CACHE_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(pois, preserve_index=False), path, compression="zstd")
+    _write_manifest({"source": source, "rows": len(pois)})
+
+
+def refresh_poi_cache(
+    pbf_path: str = POI_PBF_PATH, force: bool = False, workers: int = POI_EXTRACT_WORKERS, verbose: bool = False
+) -> bool:
+    manifest = _read_manifest()
+    if not os.path.exists(pbf_path):
+        return False
+    previous = manifest["source"] if manifest else None
+    source = source_fingerprint(pbf_path, previous)
+    if not force and previous and os.path.exists(POI_CACHE_PATH):
+        if source["sha256"] == previous["sha256"]:
+            if source != previous:
+                # Touched but unchanged: record the new mtime so we skip hashing next time.
+                _write_manifest({**manifest, "source": source})
+            return False
+    write_poi_cache(extract_pois(pbf_path, workers, verbose), source)
+    return True
+
+
+def read_poi_cache() -> pd.DataFrame | None:
+    if not os.path.exists(POI_CACHE_PATH):
+        return None
+    return pd.read_parquet(POI_CACHE_PATH, columns=POI_COLUMNS)
+
+
+# Memory-mapped from data/shared; read-only for callers. A cache rebuilt by
+# extract-pois is picked up on the next call.
+@cached_dataset("hospital_pois", lambda *_: [POI_CACHE_PATH], max_entries=2)
+@traced("load_hospital_pois")
+def load_hospital_pois(columns: tuple[str, ...] = tuple(POI_COLUMNS)) -> pd.DataFrame | None:
+    pois = shared_frame("pois", read_poi_cache, [POI_CACHE_PATH])
+    if pois is None or list(columns) == POI_COLUMNS:
+        return pois
+    return pois[list(columns)]
+
+
+if __name__ == "__main__":
+    # python -m src.utils.health_access_pois
+    rebuilt = refresh_poi_cache(force=True)
+    print(f"POI cache {'rebuilt' if rebuilt else 'unchanged'}: {POI_CACHE_PATH}")
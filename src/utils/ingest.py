@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime, timezone
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils.county_geometry import COUNTY_GEOJSON_PATH, write_geometry_artifacts
+from src.utils.county_ranks import write_rank_tables
+from src.utils.dataset_cache import file_sha256
+from src.utils.hale_cube import HALE_CUBE_PATH, read_all_ages_cube, write_all_ages_cube
+from src.utils.hale_data import read_hale_year
+from src.utils.hale_options import YEAR_OPTIONS
+from src.utils.hale_store import HALE_COLUMNS, hale_csv_path, read_hale_csv, write_hale_partition
+from src.utils.health_access_pois import POI_CACHE_PATH, POI_PBF_PATH, refresh_poi_cache
+from src.utils.sahie_data import (
+    SAHIE_CSV_PATH,
+    SAHIE_INDEX,
+    SAHIE_INDEX_PATH,
+    build_sahie_index,
+    read_sahie_csv,
+    read_sahie_index,
+)
+from src.utils.schemas import HALE_SCHEMA, SAHIE_SCHEMA, SCHEMA_VERSION
+from src.utils.shared_datasets import publish
+
+# One run per data drop: raw CSVs are normalized, validated and written as
+# artifacts, so the dashboard loaders only read (and memory-map) results.
+INGEST_MANIFEST_PATH = "./data/artifacts/manifest.json"
+
+# Valid county FIPS codes: state 01-78, county 001-999.
+FIPS_RANGE = (1001, 78999)
+
+
+class IngestError(ValueError):
+    pass
+
+
+def reference_fips(path: str = COUNTY_GEOJSON_PATH) -> set[int] | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="latin-1") as f:
+        return {int(feature["id"]) for feature in json.load(f)["features"]}
+
+
+def check_schema(df: pd.DataFrame, schema: dict[str, str], columns: list[str]) -> list[str]:
+    problems = [f"missing column {c}" for c in columns if c not in df.columns]
+    problems += [
+        f"{c} is {df[c].dtype}, expected {schema[c]}"
+        for c in columns
+        if c in df.columns and c in schema and str(df[c].dtype) != schema[c]
+    ]
+    return problems
+
+
+def check_fips(fips: pd.Series, reference: set[int] | None) -> tuple[list[str], dict]:
+    codes = pd.unique(fips)
+    low, high = FIPS_RANGE
+    invalid = codes[(codes < low) | (codes > high)]
+    problems = [f"{len(invalid)} FIPS codes outside {low}-{high}, e.g. {invalid[:5].tolist()}"] if len(invalid) else []
+    coverage = {"counties": int(len(codes))}
+    if reference is not None:
+        present = set(codes.tolist())
+        coverage["missing"] = sorted(reference - present)
+        coverage["unknown"] = sorted(present - reference)
+    return problems, coverage
+
+
+def check_hale(df: pd.DataFrame, reference: set[int] | None) -> tuple[list[str], dict]:
+    problems = check_schema(df, HALE_SCHEMA, HALE_COLUMNS)
+    if problems:
+        return problems, {}
+    fips_problems, coverage = check_fips(df["fips"], reference)
+    problems += fips_problems
+    duplicates = df.duplicated(["race_name", "sex_name", "age_name", "fips"]).sum()
+    if duplicates:
+        problems.append(f"{duplicates} duplicate (race, sex, age, fips) rows")
+    if df["val"].isna().any():
+        problems.append(f"{df['val'].isna().sum()} rows without a HALE value")
+    outside = ((df["val"] < df["lower"]) | (df["val"] > df["upper"])).sum()
+    if outside:
+        problems.append(f"{outside} rows with val outside [lower, upper]")
+    return problems, coverage
+
+
+def check_sahie(df: pd.DataFrame, reference: set[int] | None) -> tuple[list[str], dict]:
+    columns = ["fips", *SAHIE_INDEX, "PCTUI", "NIPR", "county_name", "state_name"]
+    problems = check_schema(df, SAHIE_SCHEMA, columns)
+    if problems:
+        return problems, {}
+    fips_problems, coverage = check_fips(df["fips"], reference)
+    problems += fips_problems
+    outside = ((df["PCTUI"] < 0) | (df["PCTUI"] > 100)).sum()
+    if outside:
+        problems.append(f"{outside} rows with PCTUI outside 0-100")
+    return problems, coverage
+
+
+def artifact_entry(path: str, rows: int | None = None) -> dict:
+    entry = {"sha256": file_sha256(path), "bytes": os.path.getsize(path)}
+    if rows is not None:
+        entry["rows"] = int(rows)
+    return entry
+
+
+def ingest(publish_shared: bool = True) -> dict:
+    reference = reference_fips()
+    frames, coverage, problems = {}, {}, []
+
+    # Validate everything before writing anything, so a bad drop leaves the
+    # previous artifacts in place.
+    for year in YEAR_OPTIONS:
+        df = read_hale_csv(year, HALE_COLUMNS)
+        if df is None:
+            print(f"Skipping HALE {year}: {hale_csv_path(year)} not found.")
+            continue
+        found, coverage[f"hale-{year}"] = check_hale(df, reference)
+        problems += [f"HALE {year}: {p}" for p in found]
+        frames[year] = df
+    sahie = read_sahie_csv()
+    if sahie is None:
+        print(f"Skipping SAHIE: {SAHIE_CSV_PATH} not found.")
+    else:
+        found, coverage["sahie"] = check_sahie(sahie, reference)
+        problems += [f"SAHIE: {p}" for p in found]
+    if problems:
+        raise IngestError("\n".join(problems))
+
+    artifacts = {}
+    for year, df in frames.items():
+        artifacts[write_hale_partition(df, year)] = len(df)
+    if frames and write_all_ages_cube():
+        artifacts[HALE_CUBE_PATH] = len(pd.read_parquet(HALE_CUBE_PATH, columns=["val"]))
+    if sahie is not None:
+        index = build_sahie_index(sahie)
+        os.makedirs(os.path.dirname(SAHIE_INDEX_PATH), exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(index), SAHIE_INDEX_PATH, compression="zstd")
+        artifacts[SAHIE_INDEX_PATH] = len(index)
+    # From the artifacts just written, so ranks always match the slices.
+    artifacts.update(write_rank_tables())
+    for path in write_geometry_artifacts():
+        artifacts[path] = None
+    # The POI table is only rebuilt when the OSM extract changed.
+    if os.path.exists(POI_PBF_PATH):
+        from src.utils.osm_extract import OsmExtractError
+
+        try:
+            refresh_poi_cache(verbose=True)
+        except OsmExtractError as e:
+            print(f"Skipping POIs: {e}")
+    else:
+        print(f"Skipping POIs: {POI_PBF_PATH} not found.")
+    if os.path.exists(POI_CACHE_PATH):
+        artifacts[POI_CACHE_PATH] = pq.read_metadata(POI_CACHE_PATH).num_rows
+
+    if publish_shared:
+        # Same names and frames as the loaders, so the first request attaches.
+        for year in frames:
+            publish(f"hale-{int(year)}.v{SCHEMA_VERSION}", read_hale_year(year))
+        if HALE_CUBE_PATH in artifacts:
+            publish(f"hale-all-ages.v{SCHEMA_VERSION}", read_all_ages_cube())
+        if sahie is not None:
+            publish(f"sahie-index.v{SCHEMA_VERSION}", read_sahie_index())
+
+    sources = [hale_csv_path(year) for year in frames] + [SAHIE_CSV_PATH, COUNTY_GEOJSON_PATH]
+    # A directory of per-state extracts is recorded by its own fingerprint.
+    sources += [POI_PBF_PATH] if os.path.isfile(POI_PBF_PATH) else []
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "schema_version": SCHEMA_VERSION,
+        "sources": {path: artifact_entry(path) for path in sources if os.path.exists(path)},
+        "artifacts": {path: artifact_entry(path, rows) for path, rows in artifacts.items()},
+        "coverage": coverage,
+    }
+    os.makedirs(os.path.dirname(INGEST_MANIFEST_PATH), exist_ok=True)
+    with open(INGEST_MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from typing import Protocol
+from src.utils.hale_options import AGE_OPTIONS, GENDER_OPTIONS, RACE_OPTIONS, YEAR_OPTIONS
+from src.utils.sahie_options import AGE_MAP, INCOME_MAP, SEX_MAP
+
+INSIGHT_PATHS = {
+    "hale": "./output/hale-insights.json",
+    "sahie": "./output/sahie-insights.json",
+}
+
+SYSTEM_PROMPT = (
+    "You are a public-health analyst writing for a county-level dashboard. "
+    "Write one plain-language paragraph of at most 90 words. Quote specific "
+    "numbers and county names from the data provided; do not invent figures."
+)
+
+DATASET_DESCRIPTIONS = {
+    "hale": "IHME healthy life expectancy (HALE, years) by U.S. county, 2009-2019",
+    "sahie": "Census SAHIE 2022 percent uninsured (PCTUI) by U.S. county",
+}
+
+
+def hale_keys() -> list[str]:
+    return [
+        f"{race} | {age} | {sex} | {year}"
+        for race, age, sex, year in itertools.product(
+            RACE_OPTIONS, AGE_OPTIONS, GENDER_OPTIONS, YEAR_OPTIONS
+        )
+    ]
+
+
+def sahie_keys() -> list[str]:
+    return [
+        f"{sex} | {age} | {income}"
+        for sex, age, income in itertools.product(
+            SEX_MAP.values(), AGE_MAP.values(), INCOME_MAP.values()
+        )
+    ]
+
+
+INSIGHT_KEYS = {"hale": hale_keys, "sahie": sahie_keys}
+
+
+def build_prompt(dataset: str, key: str, context: dict | None = None) -> str:
+    lines = [f"Dataset: {DATASET_DESCRIPTIONS[dataset]}", f"Filters: {key}"]
+    if context:
+        lines.append("Data summary:")
+        lines.extend(f"- {name}: {value}" for name, value in context.items())
+    lines.append("Summarize the geographic pattern and what it means for health equity.")
+    return "\n".join(lines)
+
+
+class InsightBackend(Protocol):
+    async def complete(self, system: str, prompt: str) -> str: ...
+
+
+class OpenAIBackend:
+    # Any OpenAI-compatible endpoint works, including a local stub server via base_url.
+    def __init__(self, model: str = "gpt-4o-mini", base_url: str | None = None, api_key: str | None = None):
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+
+    async def complete(self, system: str, prompt: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.4,
+        )
+        return response.choices[0].message.content.strip()
+
+
+class EchoBackend:
+    # Offline dry runs: returns the prompt so the pipeline can be exercised without an API.
+    def __init__(self, model: str = "echo", **_):
+        self.model = model
+
+    async def complete(self, system: str, prompt: str) -> str:
+        return prompt.replace("\n", " ")
+
+
+BACKENDS = {"openai": OpenAIBackend, "echo": EchoBackend}
+
+
+class RateLimiter:
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path.replace(".json", ".checkpoint.jsonl")
+
+
+def read_checkpoint(path: str) -> dict[str, str]:
+    done = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves at most one partial line.
+                    continue
+                done[record["key"]] = record["text"]
+    return done
+
+
+def write_insights(path: str, insights: dict[str, str]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(insights, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+async def _generate_one(backend, limiter, semaphore, dataset, key, context, retries):
+    prompt = build_prompt(dataset, key, context)
+    async with semaphore:
+        for attempt in range(retries + 1):
+            await limiter.acquire()
+            try:
+                return key, await backend.complete(SYSTEM_PROMPT, prompt)
+            except Exception as exc:
+                if attempt == retries:
+                    print(f"Failed {key!r}: {exc}")
+                    return key, None
+                await asyncio.sleep(min(2**attempt, 60) + random.random())
+
+
+async def generate_insights(
+    dataset: str,
+    backend: InsightBackend,
+    output_path: str | None = None,
+    contexts: dict[str, dict] | None = None,
+    concurrency: int = 8,
+    per_minute: float = 300,
+    retries: int = 4,
+    limit: int | None = None,
+    overwrite: bool = False,
+    store=None,
+    source_hash: str = "",
+) -> dict[str, str]:
+    output_path = output_path or INSIGHT_PATHS[dataset]
+    checkpoint = checkpoint_path(output_path)
+    keys = INSIGHT_KEYS[dataset]()
+
+    existing = {}
+    if os.path.exists(output_path) and not overwrite:
+        with open(output_path, "r") as f:
+            existing = json.load(f)
+    generated = read_checkpoint(checkpoint)
+    done = {**existing, **generated}
+    pending = [k for k in keys if k not in done]
+    print(f"{dataset}: {len(keys) - len(pending)} done, {len(pending)} remaining")
+    pending = pending[:limit]
+
+    limiter = RateLimiter(per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.create_task(
+            _generate_one(backend, limiter, semaphore, dataset, key, (contexts or {}).get(key), retries)
+        )
+        for key in pending
+    ]
+    failed = 0
+    with open(checkpoint, "a") as f:
+        for finished in asyncio.as_completed(tasks):
+            key, text = await finished
+            if text is None:
+                failed += 1
+                continue
+            done[key] = generated[key] = text
+            f.write(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n")
+            f.flush()
+
+    insights = {k: done[k] for k in keys if k in done}
+    write_insights(output_path, insights)
+    if store is not None and generated:
+        store.put_many(dataset, generated, model=backend.model, source_hash=source_hash)
+    if not failed:
+        os.remove(checkpoint)
+    print(f"{dataset}: wrote {len(insights)} insights to {output_path} ({failed} failed)")
+    return insights
@@ -0,0 +1,177 @@
+import os
+import numpy as np
+import pandas as pd
+from src.utils.county_ranks import ci_overlaps_median
+from src.utils.dataset_cache import cached_dataset
+from src.utils.geo_options import STATE_NAMES
+from src.utils.hale_cube import build_all_ages_cube, read_all_ages_cube, read_all_years
+from src.utils.metrics import traced
+from src.utils.sahie_data import SAHIE_INDEX, build_sahie_index, read_sahie_csv
+from src.utils.sahie_options import AGE_MAP, INCOME_MAP, SEX_MAP
+from src.utils.schemas import state_code
+
+STATS_PATHS = {
+    "hale": "./output/hale-stats.parquet",
+    "sahie": "./output/sahie-stats.parquet",
+}
+
+STATE_CODES = {int(fips): name for fips, name in STATE_NAMES.items()}
+
+# Same order as the insight JSON keys: "race | age | sex | year".
+HALE_KEYS = ["race_name", "age_name", "sex_name", "year"]
+
+
+def _extremes(df: pd.DataFrame, keys: list[str], value: str, label: str) -> pd.DataFrame:
+    # One sort, then first/last per group gives the min and max rows of every group.
+    grouped = df.sort_values(value, kind="stable").groupby(keys, observed=True, sort=False)
+    low, high = grouped[["fips", label, value]].first(), grouped[["fips", label, value]].last()
+    return pd.concat(
+        [
+            low.rename(columns={"fips": "min_fips", label: "min_county", value: "min_value"}),
+            high.rename(columns={"fips": "max_fips", label: "max_county", value: "max_value"}),
+        ],
+        axis=1,
+    )
+
+
+def _state_leaders(df: pd.DataFrame, keys: list[str], value: str) -> pd.DataFrame:
+    states = (
+        df.assign(state=state_code(df["fips"]))
+        .groupby([*keys, "state"], observed=True)[value]
+        .mean()
+        .reset_index()
+        .sort_values(value, kind="stable")
+    )
+    grouped = states.groupby(keys, observed=True, sort=False)
+    low, high = grouped[["state", value]].first(), grouped[["state", value]].last()
+    return pd.DataFrame(
+        {
+            "min_state": low["state"].map(STATE_CODES),
+            "min_state_mean": low[value],
+            "max_state": high["state"].map(STATE_CODES),
+            "max_state_mean": high[value],
+        }
+    )
+
+
+def _summaries(df: pd.DataFrame, keys: list[str], value: str, label: str) -> pd.DataFrame:
+    df = df.dropna(subset=[value])
+    stats = df.groupby(keys, observed=True).agg(
+        national_mean=(value, "mean"), national_median=(value, "median"), counties=("fips", "nunique")
+    )
+    return stats.join(_extremes(df, keys, value, label)).join(_state_leaders(df, keys, value))
+
+
+def _compact(stats: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    stats = stats.reset_index()
+    key = stats[keys[0]].astype(str)
+    for column in keys[1:]:
+        key = key + " | " + stats[column].astype(str)
+    stats.insert(0, "key", key)
+    floats = stats.select_dtypes("float64").columns
+    stats[floats] = stats[floats].astype("float32")
+    return stats.drop(columns=keys).set_index("key")
+
+
+def hale_stats(df: pd.DataFrame) -> pd.DataFrame:
+    stats = _summaries(df, HALE_KEYS, "val", "location_name").sort_index()
+    # Counties statistically indistinguishable from the median county.
+    overlaps = df.assign(overlaps=ci_overlaps_median(df, HALE_KEYS))
+    stats["median_overlaps"] = overlaps.groupby(HALE_KEYS, observed=True)["overlaps"].sum()
+    trend = stats.groupby(level=HALE_KEYS[:-1], observed=True)["national_mean"]
+    stats["yoy_delta"] = trend.diff()
+    stats["first_year_mean"] = trend.transform("first")
+    stats["last_year_mean"] = trend.transform("last")
+    return _compact(stats, HALE_KEYS)
+
+
+def sahie_stats(df: pd.DataFrame) -> pd.DataFrame:
+    stats = _summaries(df, SAHIE_INDEX, "PCTUI", "county_name").reset_index()
+    stats["sexcat"] = stats["sexcat"].map(SEX_MAP)
+    stats["agecat"] = stats["agecat"].map(AGE_MAP)
+    stats["iprcat"] = stats["iprcat"].map(INCOME_MAP)
+    return _compact(stats.dropna(subset=SAHIE_INDEX).set_index(SAHIE_INDEX), SAHIE_INDEX)
+
+
+def read_hale_frame() -> pd.DataFrame | None:
+    df = read_all_years()
+    if df is None:
+        return None
+    cube = read_all_ages_cube()
+    # Offline, so a missing cube is built from the years already read.
+    cube = build_all_ages_cube(df) if cube is None else cube.reset_index()
+    all_ages = cube.assign(age_name="All Ages")
+    return pd.concat([df, all_ages], ignore_index=True)
+
+
+def write_stats() -> list[str]:
+    written = []
+    hale = read_hale_frame()
+    sahie = read_sahie_csv()
+    for dataset, frame in (
+        ("hale", None if hale is None else hale_stats(hale)),
+        ("sahie", None if sahie is None else sahie_stats(build_sahie_index(sahie).reset_index())),
+    ):
+        if frame is None:
+            continue
+        os.makedirs(os.path.dirname(STATS_PATHS[dataset]), exist_ok=True)
+        frame.to_parquet(STATS_PATHS[dataset])
+        written.append(STATS_PATHS[dataset])
+    return written
+
+
+def read_stats(dataset: str) -> pd.DataFrame | None:
+    if os.path.exists(STATS_PATHS[dataset]):
+        return pd.read_parquet(STATS_PATHS[dataset])
+    return None
+
+
+@cached_dataset("insight_stats", lambda dataset: [STATS_PATHS[dataset]], max_entries=len(STATS_PATHS))
+@traced("load_insight_stats")
+def load_insight_stats(dataset: str) -> pd.DataFrame | None:
+    return read_stats(dataset)
+
+
+def stats_context(dataset: str, row: pd.Series) -> dict[str, str]:
+    unit = " years" if dataset == "hale" else "% uninsured"
+    context = {
+        "National county mean": f"{row['national_mean']:.1f}{unit} across {row['counties']} counties",
+        "Highest county": f"{row['max_county']} ({row['max_value']:.1f})",
+        "Lowest county": f"{row['min_county']} ({row['min_value']:.1f})",
+        "Highest state mean": f"{row['max_state']} ({row['max_state_mean']:.1f})",
+        "Lowest state mean": f"{row['min_state']} ({row['min_state_mean']:.1f})",
+    }
+    if dataset == "hale":
+        if not np.isnan(row["yoy_delta"]):
+            context["Change from previous year"] = f"{row['yoy_delta']:+.2f}{unit}"
+        context["National mean 2009 to 2019"] = (
+            f"{row['first_year_mean']:.1f} to {row['last_year_mean']:.1f}{unit}"
+        )
+    return context
+
+
+def stats_line(stats: pd.DataFrame | None, key: str, unit: str) -> str:
+    if stats is None or key not in stats.index:
+        return ""
+    row = stats.loc[key]
+    # Stats files built before the median was added only have the mean.
+    median = f" · median {row['national_median']:.1f}{unit}" if "national_median" in row else ""
+    overlaps = (
+        f" · {row['median_overlaps']:,.0f} of {row['counties']:,} county intervals include the median"
+        if "median_overlaps" in row and not np.isnan(row["median_overlaps"])
+        else ""
+    )
+    return (
+        f'<div class="key-panel-stats">'
+        f"National mean <b>{row['national_mean']:.1f}{unit}</b>{median} · "
+        f"High: {row['max_county']} ({row['max_value']:.1f}) · "
+        f"Low: {row['min_county']} ({row['min_value']:.1f}){overlaps}"
+        f"</div>"
+    )
+
+
+def stats_contexts(dataset: str) -> dict[str, dict]:
+    stats = read_stats(dataset)
+    if stats is None:
+        return {}
+    return {key: stats_context(dataset, row) for key, row in stats.iterrows()}
@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from src.utils.dataset_cache import cached_dataset
+from src.utils.hale_data import load_hale_insights
+from src.utils.metrics import traced
+from src.utils.sahie_data import load_sahie_insights
+
+INSIGHT_DB_PATH = "./output/insights.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS insights (
+    dataset     TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    lang        TEXT NOT NULL DEFAULT 'en',
+    model       TEXT NOT NULL DEFAULT '',
+    text        TEXT NOT NULL,
+    created_at  TEXT NOT NULL,
+    source_hash TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (dataset, key, lang, model)
+) WITHOUT ROWID
+"""
+
+
+class InsightStore:
+    # One connection per thread: Streamlit serves each session from its own thread.
+    def __init__(self, path: str = INSIGHT_DB_PATH, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+        if not readonly:
+            with self._connection() as conn:
+                conn.execute(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.readonly:
+                conn = self._open_readonly()
+            else:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                conn = sqlite3.connect(self.path)
+                conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _open_readonly(self) -> sqlite3.Connection:
+        # mode=ro still needs the WAL index (-shm) next to the database, which
+        # a read-only directory cannot provide. immutable=1 reads the file as
+        # it is: writes not yet checkpointed into it are not seen.
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute("PRAGMA schema_version")
+            return conn
+        except sqlite3.OperationalError:
+            return sqlite3.connect(f"file:{self.path}?immutable=1", uri=True)
+
+    def get(self, dataset: str, key: str, lang: str = "en", model: str | None = None) -> str | None:
+        # Primary-key lookup; without a model the most recent text wins.
+        query = "SELECT text FROM insights WHERE dataset = ? AND key = ? AND lang = ?"
+        params = [dataset, key, lang]
+        if model is not None:
+            query += " AND model = ?"
+            params.append(model)
+        row = self._connection().execute(
+            query + " ORDER BY created_at DESC LIMIT 1", params
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_metadata(self, dataset: str, key: str, lang: str = "en") -> list[dict]:
+        rows = self._connection().execute(
+            "SELECT model, created_at, source_hash FROM insights "
+            "WHERE dataset = ? AND key = ? AND lang = ? ORDER BY created_at DESC",
+            (dataset, key, lang),
+        )
+        return [dict(zip(("model", "created_at", "source_hash"), row)) for row in rows]
+
+    def keys(self, dataset: str, lang: str = "en") -> set[str]:
+        rows = self._connection().execute(
+            "SELECT DISTINCT key FROM insights WHERE dataset = ? AND lang = ?", (dataset, lang)
+        )
+        return {row[0] for row in rows}
+
+    def put_many(
+        self,
+        dataset: str,
+        items: dict[str, str],
+        model: str = "",
+        lang: str = "en",
+        source_hash: str = "",
+    ) -> int:
+        created_at = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO insights "
+                "(dataset, key, lang, model, text, created_at, source_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (dataset, key, lang, model, text, created_at, source_hash)
+                    for key, text in items.items()
+                ],
+            )
+        return len(items)
+
+    def import_json(self, dataset: str, path: str, model: str = "legacy") -> int:
+        with open(path, "r") as f:
+            return self.put_many(dataset, json.load(f), model=model)
+
+
+# Keyed on the database file, so a store imported after start-up is picked
+# up; queries go to the live file, so later imports need no reload.
+@cached_dataset("insight_store", lambda: [INSIGHT_DB_PATH])
+@traced("load_insight_store")
+def load_insight_store() -> InsightStore | None:
+    if os.path.exists(INSIGHT_DB_PATH):
+        return InsightStore(readonly=True)
+    return None
+
+
+LEGACY_LOADERS = {"hale": load_hale_insights, "sahie": load_sahie_insights}
+
+
+def insights_available(dataset: str) -> bool:
+    return load_insight_store() is not None or LEGACY_LOADERS[dataset]() is not None
+
+
+def load_insight(dataset: str, key: str) -> str | None:
+    store = load_insight_store()
+    if store is not None:
+        try:
+            return store.get(dataset, key)
+        except sqlite3.OperationalError:
+            # Not readable even as immutable: serve the JSON instead.
+            pass
+    # Store not imported yet (python -m src.cli import-insights): whole-file JSON.
+    insights = LEGACY_LOADERS[dataset]()
+    return None if insights is None else insights.get(key)
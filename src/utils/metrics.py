@@ -0,0 +1,175 @@
+import functools
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# Timing spans for render stages and loaders. Each finished span is added to
+# the current rerun (for the debug panel) and to per-process totals. When
+# COMMONS_CARE_METRICS_DIR is set, spans are also appended to a JSONL file and
+# the totals are dumped in Prometheus text format, one file pair per replica.
+METRICS_DIR = os.environ.get("COMMONS_CARE_METRICS_DIR")
+PROMETHEUS_INTERVAL_S = 15
+
+_local = threading.local()
+_lock = threading.Lock()
+# (name, section, cache) -> [count, seconds, max_seconds, bytes]
+_totals: dict[tuple[str, str, str], list] = {}
+_last_dump = 0.0
+
+
+def _replica() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _stack() -> list[dict]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def start_run() -> list[dict]:
+    # Called once per script run; spans finished on this thread land here.
+    _local.run = []
+    _local.stack = []
+    return _local.run
+
+
+def run_spans() -> list[dict]:
+    return getattr(_local, "run", [])
+
+
+@contextmanager
+def span(name: str, **labels):
+    stack = _stack()
+    # Nested spans inherit the section, so loader spans are attributed to the
+    # render that ran them.
+    section = stack[-1]["section"] if stack else ""
+    record = {"name": name, "section": section, "depth": len(stack), **labels}
+    stack.append(record)
+    record["start"] = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = (time.perf_counter() - record["start"]) * 1000
+        stack.pop()
+        if stack and record.get("cache"):
+            cache_outcome(record["cache"])
+        _finish(record)
+
+
+def cache_outcome(outcome: str) -> None:
+    # Reported by cache lookups and by finished child spans. A span opened
+    # with cache="" is labelled by what happened inside it: "miss" if any
+    # lookup missed, else "hit"; it stays "" when no cache was consulted.
+    stack = _stack()
+    if stack and "cache" in stack[-1]:
+        record = stack[-1]
+        if outcome == "miss" or not record["cache"]:
+            record["cache"] = outcome
+
+
+def annotate(**labels) -> None:
+    # Adds labels (e.g. bytes) to the innermost open span, if any.
+    stack = _stack()
+    if stack:
+        stack[-1].update(labels)
+
+
+def traced(name: str):
+    # Goes below @cached_dataset / @st.cache_resource: the body only runs on a
+    # cache miss, so every span it records is one.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, cache="miss"):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _finish(record: dict) -> None:
+    if hasattr(_local, "run"):
+        _local.run.append(record)
+    key = (record["name"], record["section"], record.get("cache", ""))
+    seconds = record["ms"] / 1000
+    with _lock:
+        total = _totals.setdefault(key, [0, 0.0, 0.0, 0])
+        total[0] += 1
+        total[1] += seconds
+        total[2] = max(total[2], seconds)
+        total[3] += int(record.get("bytes", 0))
+    if METRICS_DIR:
+        _export(record)
+
+
+def totals() -> list[dict]:
+    with _lock:
+        items = sorted(_totals.items())
+    return [
+        {
+            "name": name,
+            "section": section,
+            "cache": cache,
+            "count": count,
+            "total_ms": seconds * 1000,
+            "mean_ms": seconds * 1000 / count,
+            "max_ms": max_seconds * 1000,
+            "bytes": size,
+        }
+        for (name, section, cache), (count, seconds, max_seconds, size) in items
+    ]
+
+
+def prometheus_text() -> str:
+    lines = [
+        "# HELP commons_care_stage_seconds Time spent in a render stage or loader.",
+        "# TYPE commons_care_stage_seconds summary",
+    ]
+    bytes_lines = [
+        "# HELP commons_care_stage_bytes_total Figure payload bytes produced by a stage.",
+        "# TYPE commons_care_stage_bytes_total counter",
+    ]
+    replica = _replica()
+    for row in totals():
+        labels = (
+            f'replica="{replica}",stage="{row["name"]}",'
+            f'section="{row["section"]}",cache="{row["cache"]}"'
+        )
+        lines.append(f"commons_care_stage_seconds_count{{{labels}}} {row['count']}")
+        lines.append(f"commons_care_stage_seconds_sum{{{labels}}} {row['total_ms'] / 1000:.6f}")
+        if row["bytes"]:
+            bytes_lines.append(f"commons_care_stage_bytes_total{{{labels}}} {row['bytes']}")
+    return "\n".join(lines + bytes_lines) + "\n"
+
+
+def _export(record: dict) -> None:
+    global _last_dump
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    replica = _replica()
+    fields = {k: v for k, v in record.items() if k not in ("start", "depth")}
+    line = json.dumps({"ts": time.time(), "replica": replica, **fields}, default=str)
+    with _lock:
+        with open(os.path.join(METRICS_DIR, f"spans-{replica}.jsonl"), "a") as f:
+            f.write(line + "\n")
+        due = time.monotonic() - _last_dump >= PROMETHEUS_INTERVAL_S
+        if due:
+            _last_dump = time.monotonic()
+    if due:
+        write_prometheus()
+
+
+def write_prometheus(directory: str | None = None) -> str:
+    # Written then renamed, as the node_exporter textfile collector expects.
+    directory = directory or METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"commons_care-{_replica()}.prom")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+    return path
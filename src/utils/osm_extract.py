@@ -0,0 +1,174 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from src.utils.access_options import HEALTH_AMENITIES
+
+# Health amenities from a full (e.g. national) OSM extract. The extract is
+# split on disk before anything is parsed: osmium keeps the HEALTH_AMENITIES
+# elements (and the nodes their ways need) in one streaming pass, then cuts
+# that into one file per state bounding box in a second pass. Each worker
+# process parses one partition file with pyrosm and is replaced afterwards,
+# so a worker never holds more than one state's health elements. A directory
+# of per-state extracts (e.g. Geofabrik's) is used as the partitions as is.
+# Ways and relations (hospital campuses, clinic buildings) are reduced to
+# their centroids. Boxes overlap at state borders, so the merged table is
+# de-duplicated on the OSM element.
+#
+#   python -m src.cli extract-pois --pbf data/us-latest.osm.pbf --workers 4
+#   python -m src.cli extract-pois --pbf data/geofabrik-states/
+POI_EXTRACT_WORKERS = int(os.environ.get("COMMONS_CARE_POI_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+OSMIUM = os.environ.get("COMMONS_CARE_OSMIUM", "osmium")
+# Files up to this size (such as the pre-filtered data/health_filtered.osm.pbf)
+# are parsed whole, without osmium.
+SPLIT_MIN_MB = 64
+# Margin around each state box, so coastal and border POIs that fall just
+# outside the simplified county outlines are still picked up.
+PARTITION_MARGIN_DEG = 0.05
+# Grid used when no county geometry is vendored: the US extent in tiles.
+PARTITION_TILE_DEG = 5.0
+US_EXTENT = (-180.0, 17.5, -64.5, 71.5)
+PARTITION_COLUMNS = ["osm_type", "id", "amenity", "name", "lat", "lon"]
+
+
+class OsmExtractError(RuntimeError):
+    pass
+
+
+def _split_antimeridian(name: str, box: tuple) -> list[tuple[str, tuple]]:
+    # load_state_bounds folds the Aleutians west of -180; osmium wants
+    # boxes within [-180, 180].
+    west, south, east, north = box
+    if west >= -180:
+        return [(name, box)]
+    return [(f"{name}-west", (west + 360, south, 180.0, north)), (name, (-180.0, south, east, north))]
+
+
+def state_partitions(margin: float = PARTITION_MARGIN_DEG) -> list[tuple[str, tuple]]:
+    from src.utils.county_geometry import load_state_bounds
+
+    partitions = []
+    for state, (west, south, east, north) in sorted(load_state_bounds().items()):
+        box = (west - margin, max(south - margin, -90.0), min(east + margin, 180.0), min(north + margin, 90.0))
+        partitions += _split_antimeridian(state, box)
+    return partitions
+
+
+def grid_partitions(extent: tuple = US_EXTENT, tile_deg: float = PARTITION_TILE_DEG) -> list[tuple[str, tuple]]:
+    west, south, east, north = extent
+    partitions = []
+    for x in np.arange(west, east, tile_deg):
+        for y in np.arange(south, north, tile_deg):
+            box = (float(x), float(y), float(min(x + tile_deg, east)), float(min(y + tile_deg, north)))
+            partitions.append((f"{box[0]:g},{box[1]:g}", box))
+    return partitions
+
+
+def _osmium(*args: str) -> None:
+    if shutil.which(OSMIUM) is None:
+        raise OsmExtractError(
+            f"{OSMIUM} not found: install osmium-tool to split a large extract, "
+            "or pass a directory of per-state .osm.pbf files"
+        )
+    result = subprocess.run([OSMIUM, *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OsmExtractError(f"osmium {args[0]} failed:\n{result.stderr.strip()}")
+
+
+def split_pbf(pbf_path: str, partitions: list[tuple[str, tuple]], out_dir: str) -> list[tuple[str, str]]:
+    # Two streaming passes, neither of which holds the extract in memory:
+    # tags-filter keeps the health amenities plus the nodes and members they
+    # reference, and one extract run writes every partition box from that.
+    filtered = os.path.join(out_dir, "health.osm.pbf")
+    expression = "nwr/amenity=" + ",".join(HEALTH_AMENITIES)
+    _osmium("tags-filter", pbf_path, expression, "--overwrite", "-o", filtered)
+    config = {
+        "directory": out_dir,
+        "extracts": [{"output": f"part-{name}.osm.pbf", "bbox": list(box)} for name, box in partitions],
+    }
+    config_path = os.path.join(out_dir, "extracts.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f)
+    # complete_ways: a way crossing a box edge keeps all of its nodes, so its
+    # centroid is the same in every partition it lands in.
+    _osmium("extract", "--config", config_path, "--strategy", "complete_ways", "--overwrite", filtered)
+    return [(name, os.path.join(out_dir, f"part-{name}.osm.pbf")) for name, _ in partitions]
+
+
+def directory_partitions(pbf_dir: str) -> list[tuple[str, str]]:
+    names = sorted(f for f in os.listdir(pbf_dir) if f.endswith(".osm.pbf"))
+    return [(name[: -len(".osm.pbf")], os.path.join(pbf_dir, name)) for name in names]
+
+
+def extract_partition(path: str) -> pd.DataFrame:
+    # Runs in a worker process on one partition file; pyrosm and shapely are
+    # only needed here.
+    import shapely
+    from pyrosm import OSM
+
+    pois = OSM(path).get_pois(custom_filter={"amenity": list(HEALTH_AMENITIES)})
+    if pois is None or pois.empty:
+        return pd.DataFrame(columns=PARTITION_COLUMNS)
+    pois = pois[pois["amenity"].isin(HEALTH_AMENITIES.keys()) & pois.geometry.notna()]
+    # Centroids in lon/lat; fine at the size of a building or campus.
+    centroids = shapely.centroid(pois.geometry.to_numpy())
+    return pd.DataFrame(
+        {
+            "osm_type": pois["osm_type"].astype("string") if "osm_type" in pois else "node",
+            "id": pois["id"].astype("int64"),
+            "amenity": pois["amenity"].astype("string"),
+            "name": pois["name"].astype("string") if "name" in pois else pd.NA,
+            "lat": shapely.get_y(centroids).astype("float32"),
+            "lon": shapely.get_x(centroids).astype("float32"),
+        }
+    ).reset_index(drop=True)
+
+
+def merge_partitions(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return pd.DataFrame(columns=PARTITION_COLUMNS)
+    merged = pd.concat(parts, ignore_index=True)
+    # Elements in the overlap of two boxes (or crossing a border) come back once per box.
+    return merged.drop_duplicates(["osm_type", "id"]).sort_values(["osm_type", "id"], ignore_index=True)
+
+
+def parse_partitions(files: list[tuple[str, str]], workers: int = POI_EXTRACT_WORKERS, verbose: bool = False) -> pd.DataFrame:
+    parts = []
+    # One partition per worker lifetime: whatever pyrosm kept alive for a
+    # state is released before the next one is parsed.
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        started = time.perf_counter()
+        futures = {pool.submit(extract_partition, path): name for name, path in files}
+        for future in as_completed(futures):
+            part = future.result()
+            parts.append(part)
+            if verbose:
+                print(f"{futures[future]:>12}  {len(part):>7,} POIs  {time.perf_counter() - started:7.1f} s")
+    return merge_partitions(parts)
+
+
+def extract_health_pois(
+    pbf_path: str,
+    partitions: list[tuple[str, tuple]] | None = None,
+    workers: int = POI_EXTRACT_WORKERS,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    # Returns PARTITION_COLUMNS; health_access_pois.compact_pois makes the POI table.
+    if os.path.isdir(pbf_path):
+        return parse_partitions(directory_partitions(pbf_path), workers, verbose)
+    if os.path.getsize(pbf_path) <= SPLIT_MIN_MB * 2**20:
+        return merge_partitions([extract_partition(pbf_path)])
+    if partitions is None:
+        partitions = state_partitions() or grid_partitions()
+    with tempfile.TemporaryDirectory(prefix="osm-partitions-") as out_dir:
+        started = time.perf_counter()
+        files = split_pbf(pbf_path, partitions, out_dir)
+        if verbose:
+            print(f"Split into {len(files)} partitions in {time.perf_counter() - started:.1f} s")
+        return parse_partitions(files, workers, verbose)
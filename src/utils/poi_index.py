@@ -0,0 +1,100 @@
+import math
+import numpy as np
+import pandas as pd
+from src.utils.dataset_cache import cached_dataset
+from src.utils.health_access_pois import POI_CACHE_PATH, load_hospital_pois
+from src.utils.metrics import traced
+
+# Minimum map zoom -> grid cell size in degrees.
+GRID_LEVELS = {3: 1.0, 5: 0.25, 7: 0.05}
+MAX_RAW_POINTS = 20_000
+
+US_VIEW = {"center": {"lat": 39.5, "lon": -98.35}, "zoom": 3}
+
+
+def build_grid_index(pois: pd.DataFrame) -> pd.DataFrame:
+    lat = pois["lat"].to_numpy(np.float64)
+    lon = pois["lon"].to_numpy(np.float64)
+    frames = []
+    for zoom, size in GRID_LEVELS.items():
+        cells = pd.DataFrame(
+            {
+                "zoom": zoom,
+                "amenity": pois["amenity"].to_numpy(),
+                "cx": np.floor(lon / size).astype(np.int32),
+                "cy": np.floor(lat / size).astype(np.int32),
+                "lat": lat,
+                "lon": lon,
+            }
+        )
+        frames.append(
+            cells.groupby(["zoom", "amenity", "cx", "cy"], observed=True, sort=False).agg(
+                count=("lat", "size"), lat=("lat", "mean"), lon=("lon", "mean")
+            )
+        )
+    index = pd.concat(frames).reset_index(["cx", "cy"])
+    index["lat"] = index["lat"].astype("float32")
+    index["lon"] = index["lon"].astype("float32")
+    return index.sort_index()
+
+
+def grid_level(zoom: float) -> int:
+    return max((z for z in GRID_LEVELS if z <= zoom), default=min(GRID_LEVELS))
+
+
+def grid_clusters(
+    index: pd.DataFrame,
+    zoom: float,
+    amenities: list[str],
+    bounds: tuple[float, float, float, float] | None = None,
+) -> pd.DataFrame:
+    level = index.loc[grid_level(zoom)]
+    clusters = level[level.index.isin(amenities)].reset_index()
+    if bounds is not None:
+        clusters = clusters[_in_bounds(clusters, bounds)]
+    return clusters
+
+
+def _in_bounds(df: pd.DataFrame, bounds: tuple[float, float, float, float]) -> np.ndarray:
+    min_lon, min_lat, max_lon, max_lat = bounds
+    return (
+        (df["lon"].to_numpy() >= min_lon)
+        & (df["lon"].to_numpy() <= max_lon)
+        & (df["lat"].to_numpy() >= min_lat)
+        & (df["lat"].to_numpy() <= max_lat)
+    )
+
+
+def view_for_bounds(bounds: tuple[float, float, float, float]) -> dict:
+    min_lon, min_lat, max_lon, max_lat = bounds
+    extent = max(max_lon - min_lon, (max_lat - min_lat) * 1.6, 1e-3)
+    return {
+        "center": {"lat": (min_lat + max_lat) / 2, "lon": (min_lon + max_lon) / 2},
+        "zoom": min(max(math.log2(360 / extent) - 0.3, 3), 12),
+    }
+
+
+def points_in_view(
+    pois: pd.DataFrame,
+    index: pd.DataFrame,
+    amenities: list[str],
+    bounds: tuple[float, float, float, float] | None = None,
+) -> tuple[pd.DataFrame, bool]:
+    # Returns (frame, clustered). Raw points are only sent for a bounded
+    # region whose point count, read off the finest grid, fits the budget.
+    if bounds is None:
+        return grid_clusters(index, US_VIEW["zoom"], amenities), True
+    finest = grid_clusters(index, max(GRID_LEVELS), amenities, bounds)
+    if finest["count"].sum() <= MAX_RAW_POINTS:
+        selected = pois[pois["amenity"].isin(amenities)]
+        return selected[_in_bounds(selected, bounds)], False
+    return grid_clusters(index, view_for_bounds(bounds)["zoom"], amenities, bounds), True
+
+
+@cached_dataset("poi_grid_index", lambda: [POI_CACHE_PATH])
+@traced("load_poi_grid_index")
+def load_poi_grid_index() -> pd.DataFrame | None:
+    pois = load_hospital_pois()
+    if pois is None:
+        return None
+    return build_grid_index(pois)
@@ -0,0 +1,110 @@
+import importlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from src.utils.figure_cache import BACKGROUND_THREAD_PREFIX, FigureCache, load_figure_cache
+from src.utils.metrics import span
+
+# Background builds of the selections a user is likely to open next. Results
+# land in the figure cache, so a prefetched step is a plain cache hit.
+PREFETCH_WORKERS = 2
+# Prefetched figures still in the figure cache may take at most this share of
+# it, so they never crowd out what interactive renders put there.
+PREFETCH_CACHE_SHARE = 0.5
+
+
+class Prefetcher:
+    def __init__(self, figures: FigureCache, workers: int = PREFETCH_WORKERS, cache_share: float = PREFETCH_CACHE_SHARE):
+        self.figures = figures
+        self.budget_bytes = figures.max_bytes * cache_share
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"{BACKGROUND_THREAD_PREFIX}prefetch"
+        )
+        self._lock = threading.Lock()
+        # Per session: a generation counter bumped on every new selection and
+        # the futures still queued for the previous one.
+        self._generations: dict[str, int] = {}
+        self._pending: dict[str, list[Future]] = {}
+        # Bytes of each figure this pool put in the cache; entries evicted or
+        # invalidated since are dropped when the budget is checked.
+        self._prefetched: dict[tuple, int] = {}
+        self.built = self.skipped = self.cancelled = 0
+
+    def schedule(self, jobs: list[tuple[str, tuple]]) -> None:
+        ctx = get_script_run_ctx()
+        session = ctx.session_id if ctx is not None else ""
+        with self._lock:
+            generation = self._generations.get(session, 0) + 1
+            self._generations[session] = generation
+            for future in self._pending.pop(session, []):
+                if future.cancel():
+                    self.cancelled += 1
+            self._pending[session] = [
+                self._pool.submit(self._run, ctx, session, generation, section, filters)
+                for section, filters in jobs
+            ]
+
+    def _current(self, session: str, generation: int) -> bool:
+        with self._lock:
+            return self._generations.get(session) == generation
+
+    def prefetched_bytes(self) -> int:
+        with self._lock:
+            self._prefetched = {
+                key: size for key, size in self._prefetched.items() if self.figures.contains(*key)
+            }
+            return sum(self._prefetched.values())
+
+    def _run(self, ctx, session: str, generation: int, section: str, filters: tuple) -> None:
+        # Pool threads are reused: take on the scheduling run's context per job.
+        add_script_run_ctx(threading.current_thread(), ctx)
+        if not self._current(session, generation):
+            self._tally("cancelled")
+            return
+        if self.figures.contains(section, filters):
+            return
+        if self.prefetched_bytes() >= self.budget_bytes:
+            self._tally("skipped")
+            return
+        build = self.figures.builder(section)
+        if build is None:
+            # The other goal tab may not be imported yet; importing a section
+            # registers its builder.
+            importlib.import_module(f"src.sections.{section}")
+            build = self.figures.builder(section)
+        if build is None:
+            # Not registered under the map component renderer.
+            self._tally("skipped")
+            return
+        with span("prefetch", section=section):
+            fig = build(*filters)
+            # A selection change while building means the result is unlikely
+            # to be needed next; drop it rather than spend cache space on it.
+            if fig is not None and self._current(session, generation):
+                spec = self.figures.put(section, filters, fig)
+                with self._lock:
+                    self._prefetched[(section, filters)] = len(spec)
+                    self.built += 1
+
+    def _tally(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        return {
+            "built": self.built,
+            "skipped": self.skipped,
+            "cancelled": self.cancelled,
+            "mb": self.prefetched_bytes() / 2**20,
+        }
+
+
+def neighbours(options: list, value) -> list:
+    i = options.index(value)
+    return [options[j] for j in (i + 1, i - 1) if 0 <= j < len(options)]
+
+
+@st.cache_resource
+def load_prefetcher() -> Prefetcher:
+    return Prefetcher(load_figure_cache())
@@ -1,26 +1,95 @@
 import os
 import pandas as pd
-import streamlit as st
 import json
+from src.utils.dataset_cache import cached_dataset
+from src.utils.metrics import traced
+from src.utils.schemas import SAHIE_SCHEMA, SCHEMA_VERSION, apply_schema
+from src.utils.shared_datasets import shared_frame
 
+SAHIE_CSV_PATH = "./data/sahie-2022-csv/sahie_2022.csv"
+SAHIE_INDEX_PATH = "./data/artifacts/sahie_index.parquet"
+SAHIE_INSIGHTS_PATH = "./output/sahie-insights.json"
+SAHIE_SOURCES = [SAHIE_INDEX_PATH, SAHIE_CSV_PATH]
+SAHIE_INDEX = ["sexcat", "agecat", "iprcat"]
+SAHIE_COLUMNS = [
+    "geocat",
+    "statefips",
+    "countyfips",
+    *SAHIE_INDEX,
+    "PCTUI",
+    "NIPR",
+    "county_name",
+    "state_name",
+]
 
-@st.cache_data
-def load_sahie_data():
-    path = "./data/sahie-2022-csv/sahie_2022.csv"
+
+def read_sahie_csv(path: str = SAHIE_CSV_PATH) -> pd.DataFrame | None:
     if os.path.exists(path):
-        df = pd.read_csv(path)
+        df = pd.read_csv(path, usecols=SAHIE_COLUMNS)
         df = df[df["geocat"] == 50].copy()
-        df["fips"] = df["statefips"].astype(str).str.zfill(2) + df["countyfips"].astype(
-            str
-        ).str.zfill(3)
+        df["fips"] = df["statefips"] * 1000 + df["countyfips"]
         df["PCTUI"] = pd.to_numeric(df["PCTUI"], errors="coerce")
-        return df.dropna(subset=["PCTUI"])
+        df["NIPR"] = pd.to_numeric(df["NIPR"], errors="coerce")
+        df = df.dropna(subset=["PCTUI"]).drop(columns=["geocat", "statefips", "countyfips"])
+        return apply_schema(df, SAHIE_SCHEMA)
     return None
 
 
-@st.cache_data
+def build_sahie_index(df: pd.DataFrame) -> pd.DataFrame:
+    # Pre-group every (sex, age, income) combination by county once, sorted so
+    # a slice is a binary search on the index rather than three full masks.
+    return (
+        df.groupby([*SAHIE_INDEX, "fips"], sort=True, observed=True)
+        .agg(
+            {
+                "PCTUI": "mean",
+                "NIPR": "first",
+                "county_name": "first",
+                "state_name": "first",
+            }
+        )
+        .sort_index()
+    )
+
+
+def sahie_slice(index: pd.DataFrame, sex_code: int, age_code: int, income_code: int) -> pd.DataFrame:
+    try:
+        return index.loc[(sex_code, age_code, income_code)].reset_index()
+    except KeyError:
+        return index.iloc[:0].reset_index()
+
+
+def read_sahie_index() -> pd.DataFrame | None:
+    if os.path.exists(SAHIE_INDEX_PATH):
+        return apply_schema(pd.read_parquet(SAHIE_INDEX_PATH), SAHIE_SCHEMA)
+    # Not ingested yet (python -m src.cli ingest); build from the raw CSV.
+    df = read_sahie_csv()
+    if df is None:
+        return None
+    return build_sahie_index(df)
+
+
+# Memory-mapped from data/shared and shared read-only across sessions and
+# workers; cache_data would hand every rerun a full copy.
+@cached_dataset("sahie_data", lambda: SAHIE_SOURCES)
+@traced("load_sahie_data")
+def load_sahie_data() -> pd.DataFrame | None:
+    return shared_frame(f"sahie-index.v{SCHEMA_VERSION}", read_sahie_index, SAHIE_SOURCES)
+
+
+@cached_dataset("sahie_slice", lambda *_: SAHIE_SOURCES, max_entries=256, max_mb=64)
+@traced("load_sahie_slice")
+def load_sahie_slice(sex_code: int, age_code: int, income_code: int) -> pd.DataFrame | None:
+    index = load_sahie_data()
+    if index is None:
+        return None
+    return sahie_slice(index, sex_code, age_code, income_code)
+
+
+@cached_dataset("sahie_insights", lambda: [SAHIE_INSIGHTS_PATH])
+@traced("load_sahie_insights")
 def load_sahie_insights():
-    path = "./output/sahie-insights.json"
+    path = SAHIE_INSIGHTS_PATH
     if os.path.exists(path):
         with open(path, "r") as f:
             return json.load(f)
@@ -21,3 +21,8 @@ INCOME_MAP = {
     4: "≤ 400%",
     5: "138% – 400%",
 }
+
+# Reverse lookups: selectbox label -> SAHIE category code.
+SEX_CODES = {v: k for k, v in SEX_MAP.items()}
+AGE_CODES = {v: k for k, v in AGE_MAP.items()}
+INCOME_CODES = {v: k for k, v in INCOME_MAP.items()}
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# In-memory dtypes per dataset. Label columns are categorical and FIPS is the
+# integer county code; the zero-padded string is only rebuilt for plotting
+# (fips_label), where the GeoJSON feature ids need it.
+# Part of the shared-frame names, so files published under an older layout
+# are not attached after a schema change.
+SCHEMA_VERSION = 1
+
+HALE_SCHEMA = {
+    "fips": "int32",
+    "location_name": "category",
+    "race_name": "category",
+    "sex_name": "category",
+    "age_name": "category",
+    "year": "int32",
+    "val": "float32",
+    "upper": "float32",
+    "lower": "float32",
+}
+
+SAHIE_SCHEMA = {
+    "fips": "int32",
+    "sexcat": "int8",
+    "agecat": "int8",
+    "iprcat": "int8",
+    "county_name": "category",
+    "state_name": "category",
+    "PCTUI": "float32",
+    "NIPR": "float32",
+}
+
+
+def apply_schema(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    # Only declared columns that are present and not already in shape are cast.
+    casts = {
+        column: dtype
+        for column, dtype in schema.items()
+        if column in df.columns and str(df[column].dtype) != dtype
+    }
+    return df.astype(casts) if casts else df
+
+
+def fips_code(values: pd.Series) -> pd.Series:
+    # "01001", 1001.0 and 1001 all map to 1001.
+    return pd.to_numeric(values, errors="coerce").astype("int32")
+
+
+def fips_label(values) -> pd.Series:
+    codes = np.asarray(values, dtype=np.int32)
+    return pd.Series(np.char.zfill(codes.astype(str), 5), index=getattr(values, "index", None))
+
+
+def state_code(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.int32) // 1000
+
+
+def with_fips_labels(df: pd.DataFrame) -> pd.DataFrame:
+    if df["fips"].dtype.kind in "iu":
+        return df.assign(fips=fips_label(df["fips"]))
+    return df
+
+
+def legacy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # The object/float64 layout frames had before declared schemas, for the
+    # memory report.
+    out = df.copy()
+    for column in out.columns:
+        kind = out[column].dtype.kind
+        if column == "fips" and kind in "iu":
+            out[column] = fips_label(out[column]).astype(object)
+        elif isinstance(out[column].dtype, pd.CategoricalDtype):
+            out[column] = out[column].astype(object)
+        elif kind == "f":
+            out[column] = out[column].astype("float64")
+    return out
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True, index=True).sum() / 2**20
@@ -0,0 +1,61 @@
+import os
+from typing import Callable
+import pandas as pd
+import pyarrow as pa
+
+# Uncompressed Arrow IPC files that every Streamlit worker on the host
+# memory-maps. Numeric columns become zero-copy views on the page cache, so
+# N replicas share one physical copy instead of N pickled ones.
+SHARED_DIR = "./data/shared"
+
+
+def shared_path(name: str) -> str:
+    return os.path.join(SHARED_DIR, f"{name}.arrow")
+
+
+def publish(name: str, df: pd.DataFrame) -> str:
+    path = shared_path(name)
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=not isinstance(df.index, pd.RangeIndex))
+    # Write then rename, so workers already attached keep their old mapping.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+    return path
+
+
+def attach_table(name: str) -> pa.Table | None:
+    path = shared_path(name)
+    if not os.path.exists(path):
+        return None
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def attach(name: str) -> pd.DataFrame | None:
+    table = attach_table(name)
+    if table is None:
+        return None
+    # split_blocks keeps each column its own block so null-free numeric
+    # columns are not consolidated (copied) into a 2-D array.
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def is_fresh(name: str, sources: list[str]) -> bool:
+    path = shared_path(name)
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    return all(os.path.getmtime(s) <= built for s in sources if os.path.exists(s))
+
+
+def shared_frame(
+    name: str, build: Callable[[], pd.DataFrame | None], sources: list[str] = ()
+) -> pd.DataFrame | None:
+    if not is_fresh(name, list(sources)):
+        df = build()
+        if df is None:
+            return None
+        publish(name, df)
+    return attach(name)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import traceback
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils.county_ranks import SAHIE_RANKS_PATH, hale_ranks_path
+from src.utils.data_backend import (
+    HALE_SLICE_COLUMNS,
+    SAHIE_SLICE_COLUMNS,
+    SLICE_CONTENT_TYPE,
+    LocalBackend,
+    encode_slice,
+)
+from src.utils.dataset_cache import cached_dataset
+from src.utils.hale_cube import HALE_CUBE_PATH
+from src.utils.hale_data import hale_sources
+from src.utils.hale_options import AGE_OPTIONS, GENDER_OPTIONS, RACE_OPTIONS, YEAR_OPTIONS
+from src.utils.hale_trend import trend_sources
+from src.utils.health_access_pois import POI_CACHE_PATH
+from src.utils.sahie_data import SAHIE_SOURCES
+from src.utils.sahie_options import AGE_CODES, INCOME_CODES, SEX_CODES
+
+# Slice service for COMMONS_CARE_DATA_BACKEND=http: one process per host
+# loads the datasets and computes slices for every Streamlit replica.
+#
+#   python -m src.cli serve-slices --port 8765
+#
+#   GET /hale/<year>?race=&age=&sex=
+#   GET /hale-trend/<start>/<end>?race=&age=&sex=
+#   GET /sahie?sex=<code>&age=<code>&income=<code>
+#   GET /county-counts
+#   GET /healthz
+#
+# Bodies are encoded once per selection (data_backend.encode_slice) and kept
+# with their ETag in the dataset cache, keyed on the slice's source files, so
+# revalidations from replicas are answered with 304 and no body until a new
+# data drop lands. Parameters are checked against the filter options, which
+# also bounds what can end up in the cache.
+SLICE_SERVICE_PORT = 8765
+SLICE_SERVICE_ENTRIES = 1024
+SLICE_SERVICE_MAX_MB = 256
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _choice(value: str, options) -> str:
+    if value not in options:
+        raise BadRequest(f"{value!r} is not one of the filter options")
+    return value
+
+
+def _code(value: str, codes: dict) -> int:
+    if not value.isdigit() or int(value) not in codes.values():
+        raise BadRequest(f"{value!r} is not a SAHIE category code")
+    return int(value)
+
+
+def _hale_filters(query: dict) -> tuple[str, str, str]:
+    return (
+        _choice(query.get("race", ""), RACE_OPTIONS),
+        _choice(query.get("age", ""), AGE_OPTIONS),
+        _choice(query.get("sex", ""), GENDER_OPTIONS),
+    )
+
+
+def slice_key(path: str, query: dict) -> tuple:
+    # Normalized, validated request key; raises BadRequest.
+    parts = path.strip("/").split("/")
+    if parts[0] == "hale" and len(parts) == 2:
+        return ("hale", _choice(parts[1], YEAR_OPTIONS), *_hale_filters(query))
+    if parts[0] == "hale-trend" and len(parts) == 3:
+        start, end = _choice(parts[1], YEAR_OPTIONS), _choice(parts[2], YEAR_OPTIONS)
+        if int(start) > int(end):
+            raise BadRequest("start year is after end year")
+        return ("hale-trend", start, end, *_hale_filters(query))
+    if parts == ["sahie"]:
+        return (
+            "sahie",
+            _code(query.get("sex", ""), SEX_CODES),
+            _code(query.get("age", ""), AGE_CODES),
+            _code(query.get("income", ""), INCOME_CODES),
+        )
+    if parts == ["county-counts"]:
+        return ("county-counts",)
+    raise BadRequest(f"unknown slice {path!r}")
+
+
+def slice_sources(key: tuple) -> list[str]:
+    kind, *args = key
+    if kind == "hale":
+        year, _, age, _ = args
+        sources = [HALE_CUBE_PATH] if age == "All Ages" else hale_sources(year)
+        return [*sources, hale_ranks_path(year)]
+    if kind == "hale-trend":
+        return trend_sources(*args)
+    if kind == "sahie":
+        return [*SAHIE_SOURCES, SAHIE_RANKS_PATH]
+    return [POI_CACHE_PATH]
+
+
+@cached_dataset("encoded_slices", slice_sources, max_entries=SLICE_SERVICE_ENTRIES, max_mb=SLICE_SERVICE_MAX_MB)
+def encoded_slice(key: tuple) -> tuple[str, bytes] | None:
+    backend = LocalBackend()
+    kind, *args = key
+    if kind == "hale":
+        year, race, age, sex = args
+        body = _encode(backend.hale_slice(year, race, age, sex), HALE_SLICE_COLUMNS)
+    elif kind == "hale-trend":
+        body = _encode(backend.hale_trend(*args))
+    elif kind == "sahie":
+        body = _encode(backend.sahie_slice(*args), SAHIE_SLICE_COLUMNS)
+    else:
+        body = _encode(backend.county_counts())
+    if body is None:
+        return None
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"', body
+
+
+def _encode(df, columns=None) -> bytes | None:
+    return None if df is None else encode_slice(df, columns)
+
+
+class SliceHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so replicas can keep their pooled connections open.
+    protocol_version = "HTTP/1.1"
+    quiet = True
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/healthz":
+            self._send(200, b"ok", "text/plain")
+            return
+        query = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            found = encoded_slice(slice_key(url.path, query))
+        except BadRequest as e:
+            self._send(400, json.dumps({"error": str(e)}).encode(), "application/json")
+            return
+        except Exception as e:
+            # Keep the connection usable; the replica raises SliceServiceError.
+            traceback.print_exc()
+            self._send(500, json.dumps({"error": repr(e)}).encode(), "application/json")
+            return
+        if found is None:
+            self._send(404, json.dumps({"error": "dataset not found"}).encode(), "application/json")
+            return
+        etag, body = found
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", None, etag)
+            return
+        self._send(200, body, SLICE_CONTENT_TYPE, etag)
+
+    def _send(self, status: int, body: bytes, content_type: str | None, etag: str | None = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+            # Slices are cached against their source fingerprints and change
+            # as soon as an ingest rewrites the files, without a restart, so
+            # clients revalidate on every use.
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host: str = "127.0.0.1", port: int = SLICE_SERVICE_PORT, verbose: bool = False) -> None:
+    from streamlit import config, logger
+
+    # The loaders' Streamlit caches run without a script context here. Parse
+    # the config first (it resets the log level), then silence the bare-mode
+    # warnings they would log on every request.
+    config.get_config_options()
+    logger.set_log_level("error")
+    SliceHandler.quiet = not verbose
+    server = ThreadingHTTPServer((host, port), SliceHandler)
+    server.daemon_threads = True
+    print(f"Serving slices on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,92 @@
+import threading
+import pandas as pd
+import pytest
+from src.utils import slice_service
+from src.utils.data_backend import HttpBackend, SliceServiceError, encode_slice
+from src.utils.slice_service import SliceHandler, ThreadingHTTPServer
+
+COUNTS = pd.DataFrame({"fips": ["01001", "01003"], "amenity": ["hospital", "clinic"], "count": [1, 2]})
+BODY = encode_slice(COUNTS)
+
+
+class Service:
+    # The slice service's own server and handler on an ephemeral port,
+    # counting the connections it accepts and the requests it answers.
+    def __init__(self):
+        self.connections = self.requests = 0
+        self.fail_next = False
+        self.drop_after_response = False
+        service = self
+
+        class Handler(SliceHandler):
+            def setup(self):
+                service.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                service.requests += 1
+                super().do_GET()
+                if service.drop_after_response:
+                    # Close without Connection: close, as a restarted service would.
+                    service.drop_after_response = False
+                    self.close_connection = True
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def encoded_slice(self, key):
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("loader failed")
+        return '"counts-v1"', BODY
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = Service()
+    monkeypatch.setattr(slice_service, "encoded_slice", service.encoded_slice)
+    yield service
+    service.close()
+
+
+def test_revalidates_with_etag_over_one_connection(service):
+    backend = HttpBackend(service.url)
+    first = backend.county_counts()
+    second = backend.county_counts()
+    pd.testing.assert_frame_equal(first, COUNTS)
+    # A 304 hands back the frame decoded the first time.
+    assert second is first
+    assert (service.connections, service.requests) == (1, 2)
+
+
+def test_retries_a_dropped_connection(service):
+    backend = HttpBackend(service.url)
+    backend.county_counts()
+    service.drop_after_response = True
+    backend.county_counts()
+    pd.testing.assert_frame_equal(backend.county_counts(), COUNTS)
+    assert service.connections == 2
+
+
+def test_retries_a_server_error_once(service):
+    backend = HttpBackend(service.url)
+    service.fail_next = True
+    pd.testing.assert_frame_equal(backend.county_counts(), COUNTS)
+    assert service.requests == 2
+
+
+def test_does_not_retry_a_bad_request(service):
+    backend = HttpBackend(service.url)
+    with pytest.raises(SliceServiceError, match="400"):
+        backend.hale_slice(1900, "Total", "<1 year", "Both")
+    assert service.requests == 1
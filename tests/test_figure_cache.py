@@ -0,0 +1,54 @@
+import json
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from src.utils.figure_cache import PLOTLY_SPEC_STREAMLIT_VERSION
+
+
+def _chart_app():
+    import plotly.express as px
+    import plotly.io as pio
+    import streamlit as st
+    from src.utils.figure_cache import plotly_chart_spec
+
+    fig = px.scatter(x=[1, 2, 3], y=[4, 1, 2], title="spec")
+    with st.container():
+        if st.session_state.get("cached"):
+            plotly_chart_spec(pio.to_json(fig, validate=False))
+        else:
+            st.plotly_chart(fig, use_container_width=True)
+
+
+def _chart_proto(cached: bool):
+    at = AppTest.from_function(_chart_app)
+    at.session_state["cached"] = cached
+    at.run()
+    assert not at.exception
+    return at.get("plotly_chart")[0].proto
+
+
+def test_streamlit_is_the_pinned_release():
+    # Bumping Streamlit: re-check test_plotly_chart_spec_matches_st_plotly_chart
+    # against the new release, then move PLOTLY_SPEC_STREAMLIT_VERSION.
+    assert st.__version__ == PLOTLY_SPEC_STREAMLIT_VERSION
+
+
+@pytest.mark.skipif(st.__version__ != PLOTLY_SPEC_STREAMLIT_VERSION, reason="public fallback in use")
+def test_plotly_chart_spec_matches_st_plotly_chart():
+    expected, actual = _chart_proto(cached=False), _chart_proto(cached=True)
+    assert json.loads(actual.spec) == json.loads(expected.spec)
+    assert actual.config == expected.config
+    assert actual.theme == expected.theme
+    assert actual.use_container_width == expected.use_container_width
+    assert actual.form_id == expected.form_id
+    assert actual.id == expected.id
+    assert list(actual.selection_mode) == list(expected.selection_mode)
+
+
+def test_other_streamlit_releases_take_the_public_path(monkeypatch):
+    from src.utils import figure_cache
+
+    monkeypatch.setattr(figure_cache, "PLOTLY_SPEC_STREAMLIT_VERSION", "0")
+    expected, actual = _chart_proto(cached=False), _chart_proto(cached=True)
+    # Same figure; the element id follows the re-serialized text, not ours.
+    assert json.loads(actual.spec) == json.loads(expected.spec)
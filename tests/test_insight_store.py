@@ -0,0 +1,40 @@
+import sqlite3
+import pytest
+from src.utils import insight_store
+from src.utils.insight_store import InsightStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "insights.sqlite")
+    writer = InsightStore(path)
+    writer.put_many("hale", {"Total | <1 year | Both | 2019": "From the store."})
+    writer._connection().close()
+    return path
+
+
+def refuse_connect(monkeypatch, refused: str):
+    # Running as root, SQLite ignores directory permissions; refuse the URIs
+    # an unwritable directory (no -shm can be created) would refuse.
+    connect = sqlite3.connect
+
+    def guarded(database, *args, **kwargs):
+        if refused in str(database):
+            raise sqlite3.OperationalError("unable to open database file")
+        return connect(database, *args, **kwargs)
+
+    monkeypatch.setattr(insight_store.sqlite3, "connect", guarded)
+
+
+def test_readonly_store_falls_back_to_immutable(db_path, monkeypatch):
+    refuse_connect(monkeypatch, "mode=ro")
+    store = InsightStore(db_path, readonly=True)
+    assert store.get("hale", "Total | <1 year | Both | 2019") == "From the store."
+
+
+def test_unreadable_store_uses_json(db_path, monkeypatch):
+    refuse_connect(monkeypatch, "file:")
+    store = InsightStore(db_path, readonly=True)
+    monkeypatch.setattr(insight_store, "load_insight_store", lambda: store)
+    monkeypatch.setitem(insight_store.LEGACY_LOADERS, "hale", lambda: {"Total | <1 year | Both | 2019": "From JSON."})
+    assert insight_store.load_insight("hale", "Total | <1 year | Both | 2019") == "From JSON."